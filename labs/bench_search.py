@@ -0,0 +1,62 @@
+import random
+import sys
+import time
+
+from search_index import SearchIndex
+
+CATEGORIES = ["Електроніка", "Меблі", "Канцтовари", "Одяг", "Інструменти", "Посуд", "Іграшки"]
+WORDS = ["lenovo", "asus", "стілець", "стіл", "ручка", "олівець", "куртка", "молоток",
+         "тарілка", "м'яч", "шафа", "лампа", "кабель", "зошит", "чашка"]
+QUERIES = ["с", "ст", "сті", "стіл", "стілець", "lenovo 4", "zzz", "меб"]
+
+
+def make_rows(n):
+    rnd = random.Random(1)
+    return [(f"{rnd.choice(WORDS)} {rnd.choice(WORDS)} {i}", rnd.choice(CATEGORIES)) for i in range(n)]
+
+
+def linear(rows, q):
+    return [i for i, (name, category) in enumerate(rows) if q in name.lower() or q in category.lower()]
+
+
+def timed(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rows = make_rows(n)
+
+    start = time.perf_counter()
+    index = SearchIndex()
+    for i, (name, category) in enumerate(rows):
+        index.add(i, name, category)
+    print(f"rows: {n}, побудова індексу: {time.perf_counter() - start:.1f} s, триграм: {len(index.grams)}")
+
+    print(f"{'query':>10} {'found':>8} {'scan, ms':>10} {'index, ms':>10}")
+    for q in QUERIES:
+        scan, expected = timed(lambda: linear(rows, q), repeat=1)
+
+        def fresh():
+            index._last_query = None
+            return index.search(q)
+        found, result = timed(fresh)
+        assert sorted(result) == expected
+        print(f"{q:>10} {len(result):>8} {scan * 1000:>10.1f} {found * 1000:>10.3f}")
+
+    # Набір "стілець" по літері: кожен наступний запит звужує попередній.
+    index._last_query = None
+    start = time.perf_counter()
+    for i in range(1, len("стілець") + 1):
+        index.search("стілець"[:i])
+    print(f"посимвольний набір 'стілець': {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
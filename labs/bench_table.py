@@ -0,0 +1,77 @@
+import random
+import sys
+import time
+import tracemalloc
+
+from table_model import COLUMNS, ColumnTable
+
+CATEGORIES = ["Електроніка", "Меблі", "Канцтовари", "Одяг", "Інструменти", "Посуд", "Іграшки"]
+LOCATIONS = ["Склад A", "Склад B", "Магазин", "Офіс"]
+
+
+def make_values(n):
+    # Рядки як після csv.reader: кожне значення — окремий об'єкт.
+    rnd = random.Random(1)
+    for i in range(1, n + 1):
+        yield (str(i), f"Товар {rnd.randrange(n)}", "".join(rnd.choice(CATEGORIES)),
+               rnd.randrange(1000), round(rnd.uniform(1, 10000), 2),
+               "".join(rnd.choice(LOCATIONS)), f"2025-01-{i % 28 + 1:02d}T00:00:00")
+
+
+def build_dicts(n):
+    return [dict(zip(COLUMNS, values)) for values in make_values(n)]
+
+
+def build_table(n):
+    table = ColumnTable()
+    table.extend(make_values(n))
+    return table
+
+
+def measure(build, n):
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = build(n)
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return data, size, elapsed
+
+
+def sort_dicts(data, col):
+    try:
+        data.sort(key=lambda x: float(x[col]))
+    except ValueError:
+        data.sort(key=lambda x: str(x[col]).lower())
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    dicts, dict_size, dict_build = measure(build_dicts, n)
+    table, table_size, table_build = measure(build_table, n)
+    print(f"rows: {n}")
+    print(f"{'':>14} {'memory, MB':>11} {'B/row':>7} {'build, s':>9}")
+    print(f"{'list[dict]':>14} {dict_size / 2**20:>11.1f} {dict_size / n:>7.0f} {dict_build:>9.2f}")
+    print(f"{'ColumnTable':>14} {table_size / 2**20:>11.1f} {table_size / n:>7.0f} {table_build:>9.2f}")
+
+    print(f"{'sort by':>14} {'list[dict], ms':>15} {'first click, ms':>16} {'repeat, ms':>11}")
+    for col in ("price", "quantity", "category", "name", "id"):
+        dict_ms = timed(lambda: sort_dicts(dicts, col))
+        first = timed(lambda: table.sort([(col, False)]))
+        table.sort([])
+        repeat = timed(lambda: table.sort([(col, False)]))
+        print(f"{col:>14} {dict_ms:>15.0f} {first:>16.0f} {repeat:>11.1f}")
+
+    spec = [("category", False), ("price", True)]
+    first = timed(lambda: table.sort(spec))
+    table.sort([])
+    print(f"category+price: first click {first:.0f} ms, repeat {timed(lambda: table.sort(spec)):.1f} ms")
+
+if __name__ == "__main__":
+    main()
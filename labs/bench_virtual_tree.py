@@ -0,0 +1,53 @@
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from virtual_tree import VirtualTree
+
+COLUMNS = ("id", "name", "category", "quantity", "price", "location", "created_at")
+
+
+def make_rows(n, version=0):
+    return [(str(i), f"item-{i}-{version}", f"cat-{i % 50}", i % 100, float(i % 1000),
+             f"loc-{i % 20}", "2025-01-01T00:00:00") for i in range(1, n + 1)]
+
+
+def full_refresh(tree, rows):
+    # Старий підхід: видалити всі рядки і вставити весь список заново.
+    tree.delete(*tree.get_children())
+    for values in rows:
+        tree.insert("", "end", values=values)
+
+
+def timed(root, fn):
+    start = time.perf_counter()
+    fn()
+    root.update_idletasks()
+    return time.perf_counter() - start
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    root = tk.Tk()
+    root.withdraw()
+    print(f"{'rows':>10} {'full, ms':>10} {'virtual, ms':>12} {'virtual edit, ms':>17}")
+    for n in sizes:
+        rows = make_rows(n)
+        full_tree = ttk.Treeview(root, columns=COLUMNS, show="headings", height=20)
+        full = timed(root, lambda: full_refresh(full_tree, rows))
+        full_tree.destroy()
+
+        tree = ttk.Treeview(root, columns=COLUMNS, show="headings", height=20)
+        view = VirtualTree(tree)
+        virtual = timed(root, lambda: view.set_rows(rows))
+        edited = list(rows)
+        edited[3] = make_rows(4, version=1)[3]
+        edit = timed(root, lambda: view.set_rows(edited))
+        tree.destroy()
+        print(f"{n:>10} {full * 1000:>10.1f} {virtual * 1000:>12.2f} {edit * 1000:>17.2f}")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,148 @@
 import csv
+import json
 import os
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from virtual_tree import VirtualTree
 
 SERVER_URL = "http://127.0.0.1:8000"
 CACHE_FILE = "cache.csv"
-CACHE_FIELDS = ["id", "name", "category", "quantity", "price", "location", "created_at"]
+CACHE_FIELDS = ["id", "name", "category", "quantity", "price", "location", "created_at", "version"]
+JOURNAL_FILE = "journal.jsonl"
+SYNC_STATE_FILE = "sync_state.json"
+PAGE_SIZE = 500
+BULK_SIZE = 1000
+# Префікс тимчасових id товарів, створених офлайн; сервер їх не знає.
+LOCAL_PREFIX = "local-"
+
+MAX_RETRIES = 2
+BACKOFF_BASE = 0.2
+BACKOFF_MAX = 2.0
+FAILURE_THRESHOLD = 3
+PROBE_INTERVAL = 1.0
+PROBE_INTERVAL_MAX = 30.0
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE")
+POLL_MS = 50
+
+
+class ServerUnavailable(Exception):
+    pass
+
+
+class CircuitBreaker:
+    # Після FAILURE_THRESHOLD невдач поспіль коло розмикається: запити одразу
+    # падають, а фоновий потік перевіряє /health і замикає коло, коли сервер ожив.
+
+    def __init__(self, probe, on_close=None):
+        self._probe = probe
+        self._on_close = on_close
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._open = False
+
+    @property
+    def is_open(self):
+        return self._open
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._open or self._failures < FAILURE_THRESHOLD:
+                return False
+            self._open = True
+        threading.Thread(target=self._probe_loop, daemon=True).start()
+        return True
+
+    def _probe_loop(self):
+        interval = PROBE_INTERVAL
+        while True:
+            time.sleep(interval * random.uniform(0.5, 1.5))
+            if self._probe():
+                with self._lock:
+                    self._open = False
+                    self._failures = 0
+                if self._on_close:
+                    self._on_close()
+                return
+            interval = min(interval * 2, PROBE_INTERVAL_MAX)
 
 
 class ApiClient:
     def __init__(self):
-        self.mode = "online"  
+        # Одна сесія — keep-alive і пул з'єднань замість нового TCP на кожен запит.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.metrics = {"requests": 0, "retries": 0, "failures": 0, "circuit_opened": 0, "reconnects": 0}
+        self._metrics_lock = threading.Lock()
+        self.breaker = CircuitBreaker(self._probe, on_close=lambda: self._count("reconnects"))
+        # ETag/Last-Modified останнього повного списку; скидаються, щойно кеш змінено інакше.
+        self._list_validators = None
+        self._items = None
+
+    @property
+    def mode(self):
+        return "offline" if self.breaker.is_open else "online"
+
+    def _count(self, metric, n=1):
+        with self._metrics_lock:
+            self.metrics[metric] += n
+
+    def get_metrics(self):
+        with self._metrics_lock:
+            return dict(self.metrics)
+
+    def _probe(self):
+        try:
+            return self.session.get(f"{SERVER_URL}/health", timeout=2).ok
+        except requests.RequestException:
+            return False
+
+    def _request(self, method, path, timeout=2, **kwargs):
+        # Ідемпотентні запити повторюємо з експоненційною затримкою та джитером;
+        # POST/PATCH не повторюємо, щоб не створити дублікатів.
+        if self.breaker.is_open:
+            raise ServerUnavailable("Сервер недоступний, очікуємо відновлення з'єднання")
+        attempts = 1 + (MAX_RETRIES if method in IDEMPOTENT_METHODS else 0)
+        for attempt in range(attempts):
+            self._count("requests")
+            try:
+                resp = self.session.request(method, f"{SERVER_URL}{path}", timeout=timeout, **kwargs)
+                if resp.status_code < 500 or attempt + 1 == attempts:
+                    if resp.status_code < 500:
+                        self.breaker.record_success()
+                    else:
+                        self._record_failure()
+                    return resp
+            except requests.RequestException:
+                if attempt + 1 == attempts:
+                    self._record_failure()
+                    raise
+            self._count("retries")
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+            time.sleep(random.uniform(0, delay))
+
+    def _record_failure(self):
+        self._count("failures")
+        if self.breaker.record_failure():
+            self._count("circuit_opened")
 
     def _ensure_cache(self):
         if not os.path.exists(CACHE_FILE):
@@ -30,6 +160,8 @@ class ApiClient:
         return items
 
     def _save_cache(self, items):
+        self._list_validators = None
+        self._items = None
         self._ensure_cache()
         with open(CACHE_FILE, "w", newline="", encoding="utf-8") as f:
             writer = csv.DictWriter(f, fieldnames=CACHE_FIELDS)
@@ -37,23 +169,110 @@ class ApiClient:
             for item in items:
                 writer.writerow(item)
 
+    def _load_sync_version(self):
+        if not os.path.exists(SYNC_STATE_FILE):
+            return None
+        with open(SYNC_STATE_FILE, encoding="utf-8") as f:
+            return json.load(f).get("version")
+
+    def _save_sync_version(self, version):
+        with open(SYNC_STATE_FILE, "w", encoding="utf-8") as f:
+            json.dump({"version": version}, f)
+
+    # Офлайн-зміни пишемо в журнал, під час синхронізації відправляємо лише їх.
+
+    def _journal(self, entry):
+        with open(JOURNAL_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _load_journal(self):
+        if not os.path.exists(JOURNAL_FILE):
+            return []
+        with open(JOURNAL_FILE, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _save_journal(self, entries):
+        with open(JOURNAL_FILE, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    @staticmethod
+    def _collapse_journal(entries):
+        # Кілька змін одного товару зводимо до однієї: create+update -> create,
+        # update+update -> update, create+delete -> нічого.
+        pending = {}
+        for entry in entries:
+            item_id = entry["id"]
+            prev = pending.get(item_id)
+            if entry["op"] == "create":
+                pending[item_id] = {"op": "create", "id": item_id, "ref": item_id, "item": entry["item"]}
+            elif prev is None:
+                pending[item_id] = dict(entry)
+            elif entry["op"] == "update":
+                prev["item"] = {**prev.get("item", {}), **entry["item"]}
+            elif prev["op"] == "create":
+                del pending[item_id]
+            else:
+                pending[item_id] = {"op": "delete", "id": item_id, "base_version": prev.get("base_version")}
+        return list(pending.values())
+
+    def _fetch_all_items(self, timeout=2, validators=None):
+        # Забираємо список сторінками за ключем (after_id), щоб сервер не
+        # віддавав усе одним тілом. Версію й валідатори беремо з першої
+        # сторінки: видалення під час читання не зсувають наступних сторінок,
+        # а все, що змінилось після першої, прийде дельтою з /changes.
+        # Якщо перша сторінка дала 304 — items буде None.
+        items = []
+        first = None
+        while True:
+            params = {"limit": PAGE_SIZE, "sort": "id"}
+            if items:
+                params["after_id"] = items[-1]["id"]
+            headers = {}
+            if first is None and validators:
+                etag, last_modified = validators
+                if etag:
+                    headers["If-None-Match"] = etag
+                if last_modified:
+                    headers["If-Modified-Since"] = last_modified
+            resp = self._request("GET", "/items", params=params, headers=headers, timeout=timeout)
+            if resp.status_code == 304:
+                return None, None, validators
+            resp.raise_for_status()
+            if first is None:
+                first = resp
+            page = resp.json()
+            items.extend(page)
+            if len(page) < PAGE_SIZE:
+                version = first.headers.get("X-Data-Version")
+                return (items, int(version) if version is not None else None,
+                        (first.headers.get("ETag"), first.headers.get("Last-Modified")))
+
+    def get_cached_items(self):
+        return self._load_cache()
+
     def get_items(self):
         try:
-            resp = requests.get(f"{SERVER_URL}/items", timeout=2)
-            resp.raise_for_status()
-            items = resp.json()
-            self.mode = "online"
+            items, version, validators = self._fetch_all_items(validators=self._list_validators)
+            if items is None:
+                # 304: на сервері нічого не змінилось — кеш не переписуємо.
+                if self._items is None:
+                    self._items = self._load_cache()
+                return self._items, None
             self._save_cache(items)
+            self._list_validators = validators
+            self._items = items
+            if version is not None:
+                self._save_sync_version(version)
             return items, None
         except Exception as e:
-            self.mode = "offline"
             items = self._load_cache()
             return items, f"Offline режим: {e}"
 
     def create_item(self, data):
         if self.mode == "online":
             try:
-                resp = requests.post(f"{SERVER_URL}/items", json=data, timeout=2)
+                resp = self._request("POST", "/items", json=data)
                 if resp.status_code == 400:
                     return None, resp.json().get("error", "Validation error")
                 resp.raise_for_status()
@@ -61,20 +280,13 @@ class ApiClient:
                 items, _ = self.get_items()
                 return item, None
             except Exception:
-                self.mode = "offline"
+                pass
         return self._create_item_offline(data)
 
     def _create_item_offline(self, data):
         items = self._load_cache()
-        max_id = 0
-        for it in items:
-            try:
-                i = int(it["id"])
-                if i > max_id:
-                    max_id = i
-            except Exception:
-                continue
-        new_id = str(max_id + 1)
+        # Тимчасовий id; справжній призначить сервер під час синхронізації.
+        new_id = f"{LOCAL_PREFIX}{uuid.uuid4().hex[:8]}"
 
         item = {
             "id": new_id,
@@ -84,15 +296,20 @@ class ApiClient:
             "price": str(float(data["price"])),
             "location": data["location"],
             "created_at": datetime.now().isoformat(timespec="seconds"),
+            "version": "",
         }
         items.append(item)
         self._save_cache(items)
+        self._journal({"op": "create", "id": new_id, "item": {
+            k: item[k] for k in ("name", "category", "quantity", "price", "location")
+        }})
         return item, None
 
     def update_item(self, item_id, data):
-        if self.mode == "online":
+        # Ще не синхронізований товар змінюємо лише в журналі (зіллється з create).
+        if self.mode == "online" and not str(item_id).startswith(LOCAL_PREFIX):
             try:
-                resp = requests.put(f"{SERVER_URL}/items/{item_id}", json=data, timeout=2)
+                resp = self._request("PUT", f"/items/{item_id}", json=data)
                 if resp.status_code in (400, 404):
                     return None, resp.json().get("error", "Error")
                 resp.raise_for_status()
@@ -100,7 +317,7 @@ class ApiClient:
                 items, _ = self.get_items()
                 return item, None
             except Exception:
-                self.mode = "offline"
+                pass
         return self._update_item_offline(item_id, data)
 
     def _update_item_offline(self, item_id, data):
@@ -123,71 +340,96 @@ class ApiClient:
         if updated is None:
             return None, "Item not found in cache"
         self._save_cache(items)
+        self._journal({"op": "update", "id": item_id, "base_version": self._base_version(updated),
+                       "item": {k: updated[k] for k in data if k in updated}})
         return updated, None
 
+    @staticmethod
+    def _base_version(item):
+        version = item.get("version")
+        return int(version) if version not in (None, "") else None
+
     def delete_item(self, item_id):
-        if self.mode == "online":
+        # Для local-* id журнал просто прибере створення.
+        if self.mode == "online" and not str(item_id).startswith(LOCAL_PREFIX):
             try:
-                resp = requests.delete(f"{SERVER_URL}/items/{item_id}", timeout=2)
+                resp = self._request("DELETE", f"/items/{item_id}")
                 if resp.status_code == 404:
                     return "Item not found on server"
                 resp.raise_for_status()
                 items, _ = self.get_items()
                 return None
             except Exception:
-                self.mode = "offline"
+                pass
         return self._delete_item_offline(item_id)
 
     def _delete_item_offline(self, item_id):
         items = self._load_cache()
-        new_items = [i for i in items if i["id"] != item_id]
-        if len(new_items) == len(items):
+        deleted = [i for i in items if i["id"] == item_id]
+        if not deleted:
             return "Item not found in cache"
-        self._save_cache(new_items)
+        self._save_cache([i for i in items if i["id"] != item_id])
+        self._journal({"op": "delete", "id": item_id, "base_version": self._base_version(deleted[0])})
         return None
 
     def sync_with_server(self):
+        # Відправляємо лише офлайн-журнал, потім забираємо зміни сервера з /changes.
+        # У конфлікті перемагає сервер: його версія прийде разом зі стрічкою змін.
+        journal = self._collapse_journal(self._load_journal())
+        conflicts = 0
+        sent_local_ids = set()
         try:
-            resp = requests.get(f"{SERVER_URL}/items", timeout=3)
-            resp.raise_for_status()
-            server_items = resp.json()
+            for start in range(0, len(journal), BULK_SIZE):
+                chunk = journal[start:start + BULK_SIZE]
+                resp = self._request("POST", "/changes", json={"changes": chunk}, timeout=5)
+                resp.raise_for_status()
+                results = resp.json()["results"]
+                conflicts += sum(1 for r in results if r["status"] == "conflict")
+                sent_local_ids.update(e["ref"] for e in chunk if e["op"] == "create")
+                self._save_journal(journal[start + BULK_SIZE:])
+            self._pull_changes(drop_ids=sent_local_ids)
         except Exception as e:
-            self.mode = "offline"
             return f"Сервер недоступний: {e}"
 
-        self.mode = "online"
-
-        cache_items = self._load_cache()
-
-        for it in server_items:
-            try:
-                requests.delete(f"{SERVER_URL}/items/{it['id']}", timeout=2)
-            except Exception:
-                pass
-
-        for it in cache_items:
-            payload = {
-                "name": it["name"],
-                "category": it["category"],
-                "quantity": it["quantity"],
-                "price": it["price"],
-                "location": it["location"],
-            }
-            try:
-                r = requests.post(f"{SERVER_URL}/items", json=payload, timeout=2)
-                r.raise_for_status()
-            except Exception as e:
-                return f"Помилка при синхронізації: {e}"
-
-        items, err = self.get_items()
-        if err:
-            return f"Синхронізація частково вдала, але: {err}"
-
+        if conflicts:
+            return f"Синхронізація завершена, конфліктів: {conflicts} (залишено версію сервера)"
         return "Синхронізація завершена"
 
+    def _pull_changes(self, drop_ids=()):
+        # Стрічку забираємо сторінками; версію зберігаємо після кожної, тож
+        # перерваний pull продовжиться з останньої застосованої зміни.
+        since = self._load_sync_version()
+        while True:
+            resp = None
+            if since is not None:
+                resp = self._request("GET", "/changes", params={"since": since, "limit": BULK_SIZE}, timeout=5)
+            if resp is None or resp.status_code == 410:
+                # Історії змін уже немає — повне перезавантаження.
+                items, version, _ = self._fetch_all_items(timeout=5)
+                self._save_cache(items)
+                if version is not None:
+                    self._save_sync_version(version)
+                return
+            resp.raise_for_status()
+            feed = resp.json()
+
+            if feed["changes"] or drop_ids:
+                items = {it["id"]: it for it in self._load_cache() if it["id"] not in drop_ids}
+                for change in feed["changes"]:
+                    if change["op"] == "delete":
+                        items.pop(change["id"], None)
+                    else:
+                        items[change["id"]] = change["item"]
+                self._save_cache(list(items.values()))
+                drop_ids = ()
+            self._save_sync_version(feed["version"])
+            if not feed.get("more"):
+                return
+            since = feed["version"]
+
     def export_csv_from_server(self, path):
         try:
-            resp = requests.get(f"{SERVER_URL}/export", timeout=5)
+            resp = self._request("GET", "/export", timeout=5)
             resp.raise_for_status()
         except Exception as e:
             return f"Не вдалося отримати CSV з сервера: {e}"
@@ -205,8 +447,17 @@ class InventoryApp(tk.Tk):
 
         self.api = ApiClient()
 
+        # Мережеві виклики виконує один фоновий потік (кеш-файл не пишуть паралельно),
+        # результати повертаються в головний потік через чергу, яку опитує after().
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._results = queue.Queue()
+        self._pending = 0
+        self._reload_queued = False
+
         self._create_menu()
         self._create_widgets()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after(POLL_MS, self._poll_results)
         self._load_items_initial()
 
     def _create_menu(self):
@@ -231,12 +482,11 @@ class InventoryApp(tk.Tk):
         for col in ("id", "name", "category", "quantity", "price", "location", "created_at"):
             self.tree.heading(col, text=col)
             self.tree.column(col, width=100, anchor="w")
-        self.tree.bind("<<TreeviewSelect>>", self.on_tree_select)
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-        scrollbar = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscroll=scrollbar.set)
+        scrollbar = ttk.Scrollbar(main_frame, orient=tk.VERTICAL)
         scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+        self.view = VirtualTree(self.tree, scrollbar, on_select=self.on_tree_select)
 
         form_frame = ttk.Frame(main_frame)
         form_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=10)
@@ -257,44 +507,75 @@ class InventoryApp(tk.Tk):
         ttk.Button(btn_frame, text="Видалити", command=self.on_delete).grid(row=0, column=2, padx=2)
         ttk.Button(btn_frame, text="Оновити список", command=self.on_reload).grid(row=0, column=3, padx=2)
 
+        status_frame = ttk.Frame(self)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        self.progress = ttk.Progressbar(status_frame, mode="indeterminate", length=120)
+        self.progress.pack(side=tk.RIGHT, padx=2)
         self.status_var = tk.StringVar()
-        ttk.Label(self, textvariable=self.status_var, anchor="w", relief=tk.SUNKEN)\
-            .pack(side=tk.BOTTOM, fill=tk.X)
+        ttk.Label(status_frame, textvariable=self.status_var, anchor="w", relief=tk.SUNKEN)\
+            .pack(side=tk.LEFT, fill=tk.X, expand=True)
 
     def set_status(self, msg):
         self.status_var.set(msg)
         print(msg)
 
+    def run_async(self, work, on_done, label):
+        self._pending += 1
+        self.set_status(label)
+        self.progress.start(10)
+
+        def task():
+            try:
+                result = (work(), None)
+            except Exception as e:
+                result = (None, e)
+            self._results.put((on_done, result))
+
+        self._executor.submit(task)
+
+    def _poll_results(self):
+        while True:
+            try:
+                on_done, (value, error) = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if not self._pending:
+                self.progress.stop()
+            if error is not None:
+                messagebox.showerror("Помилка", str(error))
+                self.set_status(str(error))
+            else:
+                on_done(value)
+        self.after(POLL_MS, self._poll_results)
+
+    def on_close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.destroy()
+
     def _load_items_initial(self):
-        items, err = self.api.get_items()
-        if err:
-            self.set_status(err)
-        else:
-            self.set_status("Дані завантажено з сервера")
-        self._fill_tree(items)
+        def done(result):
+            items, err = result
+            self.set_status(err or "Дані завантажено з сервера")
+            self._fill_tree(items)
+
+        self.run_async(self.api.get_items, done, "Завантаження даних…")
 
     def _fill_tree(self, items):
-        self.tree.delete(*self.tree.get_children())
-        for it in items:
-            self.tree.insert(
-                "",
-                tk.END,
-                values=(
-                    it.get("id", ""),
-                    it.get("name", ""),
-                    it.get("category", ""),
-                    it.get("quantity", ""),
-                    it.get("price", ""),
-                    it.get("location", ""),
-                    it.get("created_at", ""),
-                ),
+        self.view.set_rows([
+            (
+                it.get("id", ""),
+                it.get("name", ""),
+                it.get("category", ""),
+                it.get("quantity", ""),
+                it.get("price", ""),
+                it.get("location", ""),
+                it.get("created_at", ""),
             )
+            for it in items
+        ])
 
-    def on_tree_select(self, event):
-        sel = self.tree.selection()
-        if not sel:
-            return
-        values = self.tree.item(sel[0], "values")
+    def on_tree_select(self, values):
         _, name, category, quantity, price, location, _ = values
         self.entry_vars["name"].set(name)
         self.entry_vars["category"].set(category)
@@ -328,10 +609,10 @@ class InventoryApp(tk.Tk):
         return data
 
     def get_selected_item_id(self):
-        sel = self.tree.selection()
-        if not sel:
+        values = self.view.selected_values()
+        if not values:
             return None
-        return self.tree.item(sel[0], "values")[0]
+        return values[0]
 
     def on_add(self):
         try:
@@ -341,13 +622,19 @@ class InventoryApp(tk.Tk):
             self.set_status(str(e))
             return
 
-        _, err = self.api.create_item(data)
+        def work():
+            _, err = self.api.create_item(data)
+            return (err,) + self.api.get_items()
+
+        self.run_async(work, lambda r: self._after_change(r, "Товар додано"), "Додаємо товар…")
+
+    def _after_change(self, result, message):
+        err, items, err2 = result
         if err:
             messagebox.showerror("Помилка", err)
             self.set_status(err)
-        items, err2 = self.api.get_items()
         self._fill_tree(items)
-        self.set_status("Товар додано" + (f" / {err2}" if err2 else ""))
+        self.set_status(message + (f" / {err2}" if err2 else ""))
 
     def on_update(self):
         item_id = self.get_selected_item_id()
@@ -361,13 +648,11 @@ class InventoryApp(tk.Tk):
             self.set_status(str(e))
             return
 
-        _, err = self.api.update_item(item_id, data)
-        if err:
-            messagebox.showerror("Помилка", err)
-            self.set_status(err)
-        items, err2 = self.api.get_items()
-        self._fill_tree(items)
-        self.set_status("Товар оновлено" + (f" / {err2}" if err2 else ""))
+        def work():
+            _, err = self.api.update_item(item_id, data)
+            return (err,) + self.api.get_items()
+
+        self.run_async(work, lambda r: self._after_change(r, "Товар оновлено"), "Оновлюємо товар…")
 
     def on_delete(self):
         item_id = self.get_selected_item_id()
@@ -377,30 +662,46 @@ class InventoryApp(tk.Tk):
         if not messagebox.askyesno("Підтвердження", "Видалити обраний товар?"):
             return
 
-        err = self.api.delete_item(item_id)
-        if err:
-            messagebox.showerror("Помилка", err)
-            self.set_status(err)
-        items, err2 = self.api.get_items()
-        self._fill_tree(items)
-        self.set_status("Товар видалено" + (f" / {err2}" if err2 else ""))
+        def work():
+            err = self.api.delete_item(item_id)
+            return (err,) + self.api.get_items()
+
+        self.run_async(work, lambda r: self._after_change(r, "Товар видалено"), "Видаляємо товар…")
 
     def on_reload(self):
-        items, err = self.api.get_items()
-        self._fill_tree(items)
-        self.set_status(err or "Список оновлено")
+        # Повторні натискання, поки попереднє оновлення ще в черзі, зливаємо в одне.
+        if self._reload_queued:
+            return
+        self._reload_queued = True
 
-    def on_sync(self):
-        msg = self.api.sync_with_server()
-        if msg:
-            if "завершена" in msg:
-                messagebox.showinfo("Синхронізація", msg)
-            else:
-                messagebox.showerror("Синхронізація", msg)
+        def work():
+            self._reload_queued = False
+            return self.api.get_items()
 
-        items, err = self.api.get_items()
-        self._fill_tree(items)
-        self.set_status(err or (msg or "Синхронізація завершена"))
+        def done(result):
+            items, err = result
+            self._fill_tree(items)
+            self.set_status(err or "Список оновлено")
+
+        self.run_async(work, done, "Оновлюємо список…")
+
+    def on_sync(self):
+        def work():
+            msg = self.api.sync_with_server()
+            # Після синхронізації кеш уже актуальний — повторно весь список не тягнемо.
+            return msg, self.api.get_cached_items()
+
+        def done(result):
+            msg, items = result
+            if msg:
+                if "завершена" in msg:
+                    messagebox.showinfo("Синхронізація", msg)
+                else:
+                    messagebox.showerror("Синхронізація", msg)
+            self._fill_tree(items)
+            self.set_status(msg or "Синхронізація завершена")
+
+        self.run_async(work, done, "Синхронізація…")
 
     def on_export_csv(self):
         path = filedialog.asksaveasfilename(
@@ -410,14 +711,17 @@ class InventoryApp(tk.Tk):
         )
         if not path:
             return
-        err = self.api.export_csv_from_server(path)
-        if err:
-            messagebox.showerror("Експорт CSV", err)
-            self.set_status(err)
-        else:
-            msg = f"CSV збережено в {path}"
-            messagebox.showinfo("Експорт CSV", msg)
-            self.set_status(msg)
+
+        def done(err):
+            if err:
+                messagebox.showerror("Експорт CSV", err)
+                self.set_status(err)
+            else:
+                msg = f"CSV збережено в {path}"
+                messagebox.showinfo("Експорт CSV", msg)
+                self.set_status(msg)
+
+        self.run_async(lambda: self.api.export_csv_from_server(path), done, "Експортуємо CSV…")
 
 
 if __name__ == "__main__":
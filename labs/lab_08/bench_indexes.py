@@ -0,0 +1,52 @@
+import os
+import sys
+import tempfile
+import time
+
+from bench_storage import FIELDNAMES, write_csv
+from storage import ItemStore
+
+
+def timed(fn, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def scan(rows, category=None, location=None, min_price=None, max_price=None):
+    # Так фільтрував би клієнт після завантаження всього списку.
+    return [r for r in rows
+            if (category is None or r["category"].lower() == category)
+            and (location is None or r["location"].lower() == location)
+            and (min_price is None or float(r["price"]) >= min_price)
+            and (max_price is None or float(r["price"]) <= max_price)]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "inventory.csv")
+        write_csv(path, n)
+        start = time.perf_counter()
+        store = ItemStore(path, FIELDNAMES)
+        print(f"rows: {n}, load + index build: {time.perf_counter() - start:.2f} s")
+        rows = store.all()
+
+        cases = [
+            ("category", {"category": "cat-7"}),
+            ("location", {"location": "loc-3"}),
+            ("category+location", {"category": "cat-7", "location": "loc-7"}),
+            ("price 10..20", {"min_price": 10.0, "max_price": 20.0}),
+        ]
+        print(f"{'query':>20} {'matches':>8} {'scan, ms':>10} {'index, ms':>10}")
+        for label, params in cases:
+            scan_time, found = timed(lambda: scan(rows, **params), repeat=3)
+            index_time, (total, _) = timed(lambda: store.query(**params, limit=50))
+            assert total == len(found)
+            print(f"{label:>20} {total:>8} {scan_time * 1000:>10.1f} {index_time * 1000:>10.2f}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import csv
+import os
+import sys
+import tempfile
+import time
+
+from storage import ItemStore
+
+FIELDNAMES = ["id", "name", "category", "quantity", "price", "location", "created_at"]
+
+
+def make_item(i):
+    return {
+        "id": str(i),
+        "name": f"item-{i}",
+        "category": f"cat-{i % 50}",
+        "quantity": str(i % 100),
+        "price": str(float(i % 1000)),
+        "location": f"loc-{i % 20}",
+        "created_at": "2025-01-01T00:00:00",
+    }
+
+
+def write_csv(path, n):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(make_item(i) for i in range(1, n + 1))
+
+
+def bench_rewrite(path, n, writes):
+    # Старий підхід: прочитати весь CSV і перезаписати його на кожен запит.
+    start = time.perf_counter()
+    for k in range(writes):
+        with open(path, newline="", encoding="utf-8") as f:
+            items = list(csv.DictReader(f))
+        items.append(make_item(n + k + 1))
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(items)
+    return (time.perf_counter() - start) / writes
+
+
+def bench_store(path, n, writes):
+    store = ItemStore(path, FIELDNAMES, compact_threshold=writes // 2)
+    start = time.perf_counter()
+    for k in range(writes):
+        store.put(make_item(n + k + 1))
+    elapsed = (time.perf_counter() - start) / writes
+    store.close()
+    return elapsed
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000, 500_000]
+    print(f"{'rows':>10} {'rewrite, ms/write':>20} {'log, ms/write':>15}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "inventory.csv")
+            write_csv(path, n)
+            rewrite = bench_rewrite(path, n, writes=max(3, 20_000 // n))
+            write_csv(path, n)
+            log = bench_store(path, n, writes=2_000)
+        print(f"{n:>10} {rewrite * 1000:>20.3f} {log * 1000:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
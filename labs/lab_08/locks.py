@@ -0,0 +1,131 @@
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class RWLock:
+    # Багато читачів або один письменник. Письменник може повторно
+    # захоплювати блокування (і брати читання) у своєму потоці.
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = None
+        self._depth = 0
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._depth += 1
+            else:
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+                self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                if self._writer == me:
+                    self._depth -= 1
+                else:
+                    self._readers -= 1
+                    if not self._readers:
+                        self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._depth += 1
+            else:
+                self._waiting_writers += 1
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+                self._waiting_writers -= 1
+                self._writer = me
+                self._depth = 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._depth -= 1
+                if not self._depth:
+                    self._writer = None
+                    self._cond.notify_all()
+
+
+class FileLock:
+    # Міжпроцесне блокування через окремий .lock-файл. Одночасно ним
+    # користується лише один потік процесу (під RWLock.write), тому
+    # лічильник вкладеності не потребує власної синхронізації.
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+        self._depth = 0
+
+    @contextmanager
+    def shared(self):
+        with self._hold(exclusive=False):
+            yield
+
+    @contextmanager
+    def exclusive(self):
+        with self._hold(exclusive=True):
+            yield
+
+    def try_exclusive(self):
+        if not self._depth:
+            try:
+                self._lock(exclusive=True, blocking=False)
+            except OSError:
+                return False
+        self._depth += 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if not self._depth:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    @contextmanager
+    def _hold(self, exclusive):
+        if not self._depth:
+            self._lock(exclusive, blocking=True)
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _lock(self, exclusive, blocking):
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+            if not blocking:
+                flags |= fcntl.LOCK_NB
+            fcntl.flock(self._fd, flags)
+        else:
+            # На Windows спільного режиму немає — завжди ексклюзивно.
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
@@ -1,40 +1,24 @@
 import csv
+import io
+import json
 import os
-from datetime import datetime
-from flask import Flask, request, jsonify, send_file
+import time
+import zlib
+from datetime import datetime, timezone
+from flask import Flask, Response, request, jsonify, stream_with_context
+
+from storage import ItemStore
 
 app = Flask(__name__)
 
 DATA_DIR = "data"
 CSV_PATH = os.path.join(DATA_DIR, "inventory.csv")
 FIELDNAMES = ["id", "name", "category", "quantity", "price", "location", "created_at"]
+MAX_PAGE_SIZE = 1000
+DEFAULT_PAGE_SIZE = 500
+MAX_BULK_SIZE = 10000
 
-
-def ensure_data_file():
-    os.makedirs(DATA_DIR, exist_ok=True)
-    if not os.path.exists(CSV_PATH):
-        with open(CSV_PATH, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
-            writer.writeheader()
-
-
-def read_items():
-    ensure_data_file()
-    items = []
-    with open(CSV_PATH, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            items.append(row)
-    return items
-
-
-def write_items(items):
-    ensure_data_file()
-    with open(CSV_PATH, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
-        writer.writeheader()
-        for item in items:
-            writer.writerow(item)
+store = ItemStore(CSV_PATH, FIELDNAMES)
 
 
 def validate_item_payload(data, partial=False):
@@ -72,22 +56,194 @@ def validate_item_payload(data, partial=False):
     return True, None
 
 
-def generate_new_id(items):
-    max_id = 0
-    for item in items:
-        try:
-            i = int(item["id"])
-            if i > max_id:
-                max_id = i
-        except (ValueError, TypeError):
+def new_item_fields(data):
+    return {
+        "name": data["name"],
+        "category": data["category"],
+        "quantity": str(int(data["quantity"])),
+        "price": str(float(data["price"])),
+        "location": data["location"],
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def changed_fields(data):
+    changes = {}
+    for key in ("name", "category", "location"):
+        if key in data:
+            changes[key] = data[key]
+    if "quantity" in data:
+        changes["quantity"] = str(int(data["quantity"]))
+    if "price" in data:
+        changes["price"] = str(float(data["price"]))
+    return changes
+
+
+def validate_batch(data, partial=False):
+    if not isinstance(data, list):
+        return False, "JSON body must be an array"
+    if len(data) > MAX_BULK_SIZE:
+        return False, f"Batch must not exceed {MAX_BULK_SIZE} items"
+    for i, entry in enumerate(data):
+        is_valid, error = validate_item_payload(entry, partial=partial)
+        if is_valid and partial and "id" not in entry:
+            is_valid, error = False, "Missing fields: id"
+        if not is_valid:
+            return False, f"Item {i}: {error}"
+    return True, None
+
+
+def check_not_modified():
+    # ETag будуємо з лічильника версій даних (і рядка запиту — від нього залежить тіло).
+    store.refresh_if_changed()
+    version = store.version
+    etag = f"{version}-{zlib.crc32(request.query_string):08x}"
+    # Last-Modified має точність до секунди. Поки триває секунда останньої
+    # зміни, його не віддаємо: запис пізніше в ту саму секунду дав би той
+    # самий заголовок, і клієнт з ним отримав би хибний 304.
+    second = int(store.modified_at)
+    last_modified = None
+    if second < int(time.time()):
+        last_modified = datetime.fromtimestamp(second, timezone.utc)
+
+    if request.if_none_match:
+        hit = request.if_none_match.contains(etag)
+    elif request.if_modified_since:
+        hit = second <= request.if_modified_since.timestamp()
+    else:
+        hit = False
+    return version, etag, last_modified, hit
+
+
+def with_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    # werkzeug замінює None на поточний час, тож без значення заголовок не ставимо.
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response
+
+
+def parse_sync_changes(data):
+    changes = data.get("changes") if isinstance(data, dict) else None
+    if not isinstance(changes, list):
+        return None, "JSON body must be an object with 'changes' array"
+    if len(changes) > MAX_BULK_SIZE:
+        return None, f"Batch must not exceed {MAX_BULK_SIZE} changes"
+
+    parsed = []
+    for i, change in enumerate(changes):
+        if not isinstance(change, dict) or change.get("op") not in ("create", "update", "delete"):
+            return None, f"Change {i}: field 'op' must be create, update or delete"
+        base_version = change.get("base_version")
+        if base_version is not None and not isinstance(base_version, int):
+            return None, f"Change {i}: field 'base_version' must be integer"
+
+        if change["op"] == "create":
+            is_valid, error = validate_item_payload(change.get("item"), partial=False)
+            if not is_valid:
+                return None, f"Change {i}: {error}"
+            parsed.append({"op": "create", "ref": change.get("ref"), "item": new_item_fields(change["item"])})
             continue
-    return str(max_id + 1)
+
+        if "id" not in change:
+            return None, f"Change {i}: Missing fields: id"
+        entry = {"op": change["op"], "id": str(change["id"]), "base_version": base_version}
+        if change["op"] == "update":
+            is_valid, error = validate_item_payload(change.get("item"), partial=True)
+            if not is_valid:
+                return None, f"Change {i}: {error}"
+            entry["item"] = changed_fields(change["item"])
+        parsed.append(entry)
+    return parsed, None
+
+
+def parse_list_params(args):
+    params = {}
+    for key in ("limit", "offset"):
+        if key in args:
+            try:
+                value = int(args[key])
+            except ValueError:
+                return None, f"Parameter '{key}' must be integer"
+            if value < 0:
+                return None, f"Parameter '{key}' must be non-negative"
+            params[key] = value
+    params["offset"] = params.get("offset", 0)
+    # Без limit — сторінка за замовчуванням: відповідь обмежена за будь-якого
+    # розміру складу, решту видно з X-Total-Count.
+    params["limit"] = params.get("limit", DEFAULT_PAGE_SIZE)
+    if params["limit"] > MAX_PAGE_SIZE:
+        return None, f"Parameter 'limit' must not exceed {MAX_PAGE_SIZE}"
+
+    sort = args.get("sort")
+    if sort:
+        field = sort.lstrip("-")
+        if field not in FIELDNAMES:
+            return None, f"Unknown sort field '{field}'"
+        params["sort"] = field
+        params["reverse"] = sort.startswith("-")
+
+    for key in ("min_price", "max_price"):
+        if key in args:
+            try:
+                params[key] = float(args[key])
+            except ValueError:
+                return None, f"Parameter '{key}' must be number"
+
+    for key in ("name", "category", "location"):
+        if args.get(key):
+            params[key] = args[key]
+
+    if "after_id" in args:
+        if params.get("sort", "id") != "id" or params.get("reverse") or params["offset"]:
+            return None, "Parameter 'after_id' works only with sort=id and without offset"
+        params["after_id"] = args["after_id"]
+    return params, None
+
+
+def stream_json_array(rows):
+    yield "["
+    for i, row in enumerate(rows):
+        yield ("," if i else "") + json.dumps(row, ensure_ascii=False)
+    yield "]"
+
+
+def stream_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELDNAMES, extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= 1 << 16:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+@app.route("/health", methods=["GET"])
+def health():
+    return jsonify({"ok": True, "version": store.version})
 
 
 @app.route("/items", methods=["GET"])
 def get_items():
-    items = read_items()
-    return jsonify(items)
+    params, error = parse_list_params(request.args)
+    if error:
+        return jsonify({"error": error}), 400
+
+    version, etag, last_modified, not_modified = check_not_modified()
+    if not_modified:
+        response = with_validators(Response(status=304), etag, last_modified)
+        response.headers["X-Data-Version"] = str(version)
+        return response
+
+    total, rows = store.query(**params)
+    response = Response(stream_with_context(stream_json_array(rows)), mimetype="application/json")
+    response.headers["X-Total-Count"] = str(total)
+    response.headers["X-Data-Version"] = str(version)
+    return with_validators(response, etag, last_modified)
 
 
 @app.route("/items", methods=["POST"])
@@ -97,21 +253,7 @@ def create_item():
     if not is_valid:
         return jsonify({"error": error}), 400
 
-    items = read_items()
-    new_id = generate_new_id(items)
-
-    item = {
-        "id": new_id,
-        "name": data["name"],
-        "category": data["category"],
-        "quantity": str(int(data["quantity"])),
-        "price": str(float(data["price"])),
-        "location": data["location"],
-        "created_at": datetime.now().isoformat(timespec="seconds"),
-    }
-
-    items.append(item)
-    write_items(items)
+    item = store.create(new_item_fields(data))
     return jsonify(item), 201
 
 
@@ -122,46 +264,96 @@ def update_item(item_id):
     if not is_valid:
         return jsonify({"error": error}), 400
 
-    items = read_items()
-    for item in items:
-        if item["id"] == item_id:
-            if "name" in data:
-                item["name"] = data["name"]
-            if "category" in data:
-                item["category"] = data["category"]
-            if "quantity" in data:
-                item["quantity"] = str(int(data["quantity"]))
-            if "price" in data:
-                item["price"] = str(float(data["price"]))
-            if "location" in data:
-                item["location"] = data["location"]
-            write_items(items)
-            return jsonify(item)
-
-    return jsonify({"error": "Item not found"}), 404
+    item = store.update(item_id, changed_fields(data))
+    if item is None:
+        return jsonify({"error": "Item not found"}), 404
+    return jsonify(item)
 
 
 @app.route("/items/<item_id>", methods=["DELETE"])
 def delete_item(item_id):
-    items = read_items()
-    new_items = [i for i in items if i["id"] != item_id]
-    if len(new_items) == len(items):
+    if not store.delete(item_id):
         return jsonify({"error": "Item not found"}), 404
-    write_items(new_items)
     return "", 204
 
 
+@app.route("/items/bulk", methods=["POST"])
+def create_items_bulk():
+    data = request.get_json()
+    is_valid, error = validate_batch(data)
+    if not is_valid:
+        return jsonify({"error": error}), 400
+
+    items = store.create_many([new_item_fields(entry) for entry in data])
+    return jsonify(items), 201
+
+
+@app.route("/items/bulk", methods=["PATCH"])
+def update_items_bulk():
+    data = request.get_json()
+    is_valid, error = validate_batch(data, partial=True)
+    if not is_valid:
+        return jsonify({"error": error}), 400
+
+    items, missing = store.update_many([(str(entry["id"]), changed_fields(entry)) for entry in data])
+    if missing:
+        return jsonify({"error": "Items not found", "missing": missing}), 404
+    return jsonify(items)
+
+
+@app.route("/items/bulk", methods=["DELETE"])
+def delete_items_bulk():
+    data = request.get_json()
+    ids = data.get("ids") if isinstance(data, dict) else None
+    if not isinstance(ids, list):
+        return jsonify({"error": "JSON body must be an object with 'ids' array"}), 400
+    if len(ids) > MAX_BULK_SIZE:
+        return jsonify({"error": f"Batch must not exceed {MAX_BULK_SIZE} items"}), 400
+
+    missing = store.delete_many([str(i) for i in ids])
+    if missing:
+        return jsonify({"error": "Items not found", "missing": missing}), 404
+    return "", 204
+
+
+@app.route("/changes", methods=["GET"])
+def get_changes():
+    try:
+        since = int(request.args.get("since", 0))
+        limit = int(request.args["limit"]) if "limit" in request.args else None
+    except ValueError:
+        return jsonify({"error": "Parameters 'since' and 'limit' must be integers"}), 400
+    if limit is not None and limit < 1:
+        return jsonify({"error": "Parameter 'limit' must be positive"}), 400
+
+    feed = store.changes_since(since, limit=limit)
+    if feed is None:
+        return jsonify({"error": "Change history is no longer available, full resync required",
+                        "version": store.version}), 410
+    return jsonify(feed)
+
+
+@app.route("/changes", methods=["POST"])
+def push_changes():
+    changes, error = parse_sync_changes(request.get_json())
+    if error:
+        return jsonify({"error": error}), 400
+    return jsonify(store.apply_changes(changes))
+
+
 @app.route("/export", methods=["GET"])
 def export_csv():
-    ensure_data_file()
-    return send_file(
-        CSV_PATH,
-        mimetype="text/csv",
-        as_attachment=True,
-        download_name="inventory.csv",
-    )
+    _, etag, last_modified, not_modified = check_not_modified()
+    if not_modified:
+        return with_validators(Response(status=304), etag, last_modified)
+
+    # Знімок рядків береться під блокуванням читання, тож містить усі записи
+    # журналу, навіть коли компакцію зараз виконує інший воркер і CSV на диску старий.
+    rows = store.all()
+    response = Response(stream_with_context(stream_csv(rows)), mimetype="text/csv")
+    response.headers["Content-Disposition"] = "attachment; filename=inventory.csv"
+    return with_validators(response, etag, last_modified)
 
 
 if __name__ == "__main__":
-    ensure_data_file()
     app.run(host="127.0.0.1", port=8000, debug=True)
@@ -0,0 +1,552 @@
+import bisect
+import csv
+import heapq
+import json
+import os
+import threading
+import time
+from itertools import islice
+from contextlib import contextmanager
+
+from locks import FileLock, RWLock
+
+
+class ItemStore:
+    # Поточний стан тримаємо в пам'яті, кожну зміну дописуємо в журнал (<csv>.log),
+    # а CSV-знімок періодично перезаписуємо у фоні (компакція).
+    #
+    # Потоки одного процесу синхронізуються через RWLock, процеси (кілька
+    # воркерів gunicorn) — через flock на <csv>.lock. Перед кожним записом
+    # процес дочитує чужі записи з хвоста журналу, тому id не дублюються.
+    #
+    # Кожна зміна отримує наступну версію (глобальний лічильник), а рядок
+    # зберігає свою версію в полі "version". changelog (id -> (версія, видалено))
+    # упорядкований за версією — з нього віддаємо стрічку змін для синхронізації.
+    # Версії та надгробки видалених рядків лежать у <csv>.meta.json поруч зі знімком.
+
+    MAX_TOMBSTONES = 100000
+
+    def __init__(self, csv_path, fieldnames, compact_threshold=10000):
+        self.csv_path = csv_path
+        self.log_path = csv_path + ".log"
+        self.old_log_path = self.log_path + ".old"
+        self.meta_path = csv_path + ".meta.json"
+        self.fieldnames = fieldnames
+        self.compact_threshold = compact_threshold
+        self.items = {}
+        self.next_id = 1
+        # Вторинні індекси: категорія/локація (без регістру) -> множина id
+        # та відсортований список (ціна, id) для діапазонних запитів.
+        self.by_category = {}
+        self.by_location = {}
+        self.by_price = []
+        self.version = 0
+        self.floor = 0
+        self.modified_at = 0.0
+        self.changelog = {}
+        self._tombstones = 0
+        self._rw = RWLock()
+        self._file_lock = FileLock(csv_path + ".lock")
+        self._compact_lock = FileLock(csv_path + ".compact.lock")
+        self._stamp = None
+        self._log = None
+        self._log_records = 0
+        self._compactor = None
+
+        directory = os.path.dirname(csv_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._rw.write(), self._file_lock.exclusive():
+            self._load()
+
+    def refresh_if_changed(self):
+        # Перечитуємо файли лише тоді, коли їх змінив хтось інший (mtime/size/inode).
+        if self._file_stamp() != self._stamp:
+            with self._rw.write(), self._file_lock.shared():
+                self._catch_up()
+
+    def close(self):
+        with self._rw.read():
+            compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self._rw.write():
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            self._file_lock.close()
+            self._compact_lock.close()
+
+    def all(self):
+        with self._reading():
+            return list(self.items.values())
+
+    def get(self, item_id):
+        with self._reading():
+            return self.items.get(item_id)
+
+    def query(self, name=None, category=None, location=None, min_price=None, max_price=None,
+              sort=None, reverse=False, offset=0, limit=None, after_id=None):
+        # Повертає (кількість знайдених, ітератор по сторінці). Рядки незмінні,
+        # тож після копіювання списку посилань блокування більше не потрібне.
+        # after_id — сторінки за ключем: рядки з id більшим за after_id у
+        # порядку id; на відміну від offset, видалення на попередніх
+        # сторінках не зсувають наступні.
+        with self._reading():
+            candidates = self._indexed_ids(category, location, min_price, max_price)
+            if candidates is None:
+                rows = list(self.items.values())
+            else:
+                rows = [self.items[i] for i in candidates]
+                if not sort:
+                    sort = "id"
+
+        if name:
+            name = name.lower()
+            rows = [r for r in rows if name in r["name"].lower()]
+
+        total = len(rows)
+        if after_id is not None:
+            key = self._sort_key("id")
+            start = key({"id": after_id})
+            rows = [r for r in rows if key(r) > start]
+            sort, reverse = "id", False
+        if sort:
+            key = self._sort_key(sort)
+            if limit is not None:
+                select = heapq.nlargest if reverse else heapq.nsmallest
+                rows = select(offset + limit, rows, key=key)
+            else:
+                rows = sorted(rows, key=key, reverse=reverse)
+        stop = offset + limit if limit is not None else None
+        return total, islice(rows, offset, stop)
+
+    def changes_since(self, since, limit=None):
+        # None — якщо надгробки старші за since вже прибрані і потрібна повна синхронізація.
+        with self._reading():
+            if since < self.floor:
+                return None
+            changes = []
+            for item_id, (version, deleted) in reversed(self.changelog.items()):
+                if version <= since:
+                    break
+                change = {"version": version, "id": item_id, "op": "delete" if deleted else "put"}
+                if not deleted:
+                    change["item"] = self.items[item_id]
+                changes.append(change)
+            changes.reverse()
+            # Обрізана стрічка повертає версію останньої виданої зміни, щоб
+            # клієнт продовжив саме з неї, і more — що є ще.
+            if limit is not None and len(changes) > limit:
+                changes = changes[:limit]
+                version = changes[-1]["version"] if changes else since
+                return {"version": version, "changes": changes, "more": True}
+            return {"version": self.version, "changes": changes, "more": False}
+
+    def apply_changes(self, changes):
+        # Зміни з офлайн-журналу клієнта. update/delete з base_version, що не
+        # збігається з поточною версією рядка, не застосовуються (конфлікт).
+        with self._writing():
+            results, puts, deletes, touched = [], [], [], set()
+            next_id = self.next_id
+            for change in changes:
+                op = change["op"]
+                item_id = change.get("id")
+                if op == "create":
+                    item = self._normalize(dict(change["item"], id=str(next_id)))
+                    next_id += 1
+                    puts.append(item)
+                    results.append({"ref": change.get("ref"), "status": "applied", "item": item})
+                    continue
+
+                current = self.items.get(item_id)
+                base_version = change.get("base_version")
+                if current is None:
+                    results.append({"id": item_id, "status": "not_found"})
+                elif item_id in touched or (base_version is not None and base_version != current["version"]):
+                    results.append({"id": item_id, "status": "conflict", "item": current})
+                elif op == "update":
+                    item = self._normalize(dict(current, **change["item"], id=item_id))
+                    puts.append(item)
+                    results.append({"id": item_id, "status": "applied", "item": item})
+                else:
+                    deletes.append(item_id)
+                    results.append({"id": item_id, "status": "applied"})
+                if item_id is not None:
+                    touched.add(item_id)
+            self._commit(puts, deletes)
+            return {"version": self.version, "results": results}
+
+    def _indexed_ids(self, category, location, min_price, max_price):
+        # Починаємо з найменшої множини й перетинаємо з рештою.
+        sets = []
+        if category:
+            sets.append(self.by_category.get(category.lower(), set()))
+        if location:
+            sets.append(self.by_location.get(location.lower(), set()))
+        if min_price is not None or max_price is not None:
+            lo = 0 if min_price is None else bisect.bisect_left(self.by_price, (min_price, ""))
+            hi = len(self.by_price) if max_price is None else bisect.bisect_right(self.by_price, (max_price, "\uffff"))
+            sets.append({item_id for _, item_id in self.by_price[lo:hi]})
+        if not sets:
+            return None
+        sets.sort(key=len)
+        result = set(sets[0])
+        for other in sets[1:]:
+            result &= other
+        return result
+
+    @staticmethod
+    def _sort_key(field):
+        def key(row):
+            value = row[field]
+            try:
+                return 0, float(value), ""
+            except (ValueError, TypeError):
+                return 1, 0.0, str(value).lower()
+        return key
+
+    def create(self, item):
+        return self.create_many([item])[0]
+
+    def put(self, item):
+        with self._writing():
+            item = self._normalize(item)
+            self._commit([item], [])
+            return item
+
+    def update(self, item_id, changes):
+        updated, _ = self.update_many([(item_id, changes)])
+        return updated[0] if updated else None
+
+    def delete(self, item_id):
+        return not self.delete_many([item_id])
+
+    # Пакетні операції: або застосовується весь пакет, або нічого,
+    # і на весь пакет — один запис у журнал.
+
+    def create_many(self, items):
+        with self._writing():
+            created = [self._normalize(dict(item, id=str(self.next_id + i)))
+                       for i, item in enumerate(items)]
+            self._commit(created, [])
+            return created
+
+    def update_many(self, changes):
+        with self._writing():
+            missing = [item_id for item_id, _ in changes if item_id not in self.items]
+            if missing:
+                return None, missing
+            updated = {}
+            for item_id, fields in changes:
+                base = updated.get(item_id) or self.items[item_id]
+                updated[item_id] = self._normalize(dict(base, **fields, id=item_id))
+            rows = list(updated.values())
+            self._commit(rows, [])
+            return rows, []
+
+    def delete_many(self, item_ids):
+        with self._writing():
+            item_ids = list(dict.fromkeys(item_ids))
+            missing = [item_id for item_id in item_ids if item_id not in self.items]
+            if missing:
+                return missing
+            self._commit([], item_ids)
+            return []
+
+    def compact(self, background=False):
+        with self._rw.read():
+            running = self._compactor
+        if running is not None:
+            if background:
+                return
+            running.join()
+
+        with self._writing(auto_compact=False):
+            if self._compactor is not None:
+                return
+            # Компактує лише один процес одночасно.
+            if not self._compact_lock.try_exclusive():
+                return
+            # Рядки не змінюються на місці (put замінює dict цілком),
+            # тому достатньо скопіювати список посилань.
+            rows = list(self.items.values())
+            meta = self._meta_snapshot()
+            self._rotate_log()
+            compactor = self._compactor = threading.Thread(
+                target=self._finish_compaction, args=(rows, meta), daemon=True)
+            compactor.start()
+        if not background:
+            compactor.join()
+
+    @contextmanager
+    def _reading(self):
+        self.refresh_if_changed()
+        with self._rw.read():
+            yield
+
+    @contextmanager
+    def _writing(self, auto_compact=True):
+        with self._rw.write(), self._file_lock.exclusive():
+            self._catch_up()
+            yield
+            # Компакцію запускаємо вже після зміни в пам'яті, щоб знімок її містив.
+            if auto_compact and self._log_records >= self.compact_threshold:
+                self.compact(background=True)
+
+    def _normalize(self, item):
+        return {k: item.get(k, "") for k in self.fieldnames}
+
+    def _commit(self, puts, deletes):
+        records = []
+        for item in puts:
+            self.version += 1
+            item["version"] = self.version
+            records.append({"op": "put", "item": item})
+        for item_id in deletes:
+            self.version += 1
+            records.append({"op": "delete", "id": item_id, "v": self.version})
+        self._append(records)
+        for record in records:
+            self._apply(record)
+        self.modified_at = time.time()
+
+    def _set(self, item, bulk=False):
+        item_id = item["id"]
+        if item_id in self.items:
+            self._unindex(self.items[item_id])
+        self.items[item_id] = item
+        if not bulk:
+            self._log_change(item_id, item["version"], deleted=False)
+        self.by_category.setdefault(item["category"].lower(), set()).add(item_id)
+        self.by_location.setdefault(item["location"].lower(), set()).add(item_id)
+        price = self._price(item)
+        if price is not None:
+            if bulk:
+                self.by_price.append((price, item_id))
+            else:
+                bisect.insort(self.by_price, (price, item_id))
+        self._bump_next_id(item_id)
+
+    def _unset(self, item_id, version):
+        self._unindex(self.items.pop(item_id))
+        self._log_change(item_id, version, deleted=True)
+
+    def _log_change(self, item_id, version, deleted):
+        previous = self.changelog.pop(item_id, None)
+        if previous is not None and previous[1]:
+            self._tombstones -= 1
+        self.changelog[item_id] = (version, deleted)
+        if deleted:
+            self._tombstones += 1
+        if version > self.version:
+            self.version = version
+
+    def _meta_snapshot(self):
+        if self._tombstones > self.MAX_TOMBSTONES:
+            # Прибираємо найстаріші надгробки; клієнти, що відстали більше, отримають повну синхронізацію.
+            for item_id, (version, deleted) in list(self.changelog.items()):
+                if self._tombstones <= self.MAX_TOMBSTONES // 2:
+                    break
+                if deleted:
+                    del self.changelog[item_id]
+                    self._tombstones -= 1
+                    self.floor = max(self.floor, version)
+        return {
+            "version": self.version,
+            "floor": self.floor,
+            "changelog": [[item_id, version, deleted] for item_id, (version, deleted) in self.changelog.items()],
+        }
+
+    def _unindex(self, item):
+        item_id = item["id"]
+        for index, key in ((self.by_category, item["category"].lower()),
+                           (self.by_location, item["location"].lower())):
+            ids = index[key]
+            ids.discard(item_id)
+            if not ids:
+                del index[key]
+        price = self._price(item)
+        if price is not None:
+            entry = (price, item_id)
+            pos = bisect.bisect_left(self.by_price, entry)
+            if pos < len(self.by_price) and self.by_price[pos] == entry:
+                del self.by_price[pos]
+            else:
+                self.by_price.remove(entry)
+
+    @staticmethod
+    def _price(item):
+        try:
+            return float(item["price"])
+        except (ValueError, TypeError):
+            return None
+
+    def _finish_compaction(self, rows, meta):
+        try:
+            meta_tmp_path = f"{self.meta_path}.{os.getpid()}.tmp"
+            with open(meta_tmp_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            tmp_path = self._write_snapshot_tmp(rows)
+            with self._rw.write(), self._file_lock.exclusive():
+                # Спершу метадані, потім знімок: доки існує .old, записи журналу
+                # з версіями все одно перекриють можливу розбіжність після збою.
+                os.replace(meta_tmp_path, self.meta_path)
+                os.replace(tmp_path, self.csv_path)
+                if os.path.exists(self.old_log_path):
+                    os.remove(self.old_log_path)
+                # Оновлюємо лише відбиток знімка: записи інших процесів у новий
+                # журнал ще не прочитані, їх підхопить наступний _catch_up.
+                self._stamp = (self._file_stamp()[0], self._stamp[1])
+        finally:
+            with self._rw.write():
+                self._compactor = None
+                self._compact_lock.release()
+
+    def _load(self):
+        if not os.path.exists(self.csv_path):
+            os.replace(self._write_snapshot_tmp([]), self.csv_path)
+        self.items = {}
+        self.by_category = {}
+        self.by_location = {}
+        self.by_price = []
+        self.next_id = 1
+        meta = {"version": 0, "floor": 0, "changelog": []}
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        versions = {item_id: (version, deleted) for item_id, version, deleted in meta["changelog"]}
+
+        with open(self.csv_path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                row["version"] = versions.get(row["id"], (0, False))[0]
+                self._set(row, bulk=True)
+        self.by_price.sort()
+
+        # Рядки без запису в метаданих (старий знімок) ставимо на початок з версією 0.
+        self.changelog = {item_id: (0, False) for item_id in self.items if item_id not in versions}
+        self.changelog.update(versions)
+        self._tombstones = sum(1 for _, deleted in versions.values() if deleted)
+        self.version = meta["version"]
+        self.floor = meta["floor"]
+
+        self._log_records = 0
+        for path in (self.old_log_path, self.log_path):
+            count, _ = self._replay(path)
+            self._log_records += count
+        for item_id, (_, deleted) in list(self.changelog.items()):
+            if not deleted and item_id not in self.items:
+                del self.changelog[item_id]
+        self.modified_at = self._files_mtime()
+
+        if self._log is not None:
+            self._log.close()
+        self._log = open(self.log_path, "ab")
+        self._stamp = self._file_stamp()
+
+    def _catch_up(self):
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return
+        csv_stamp, log_stamp = stamp
+        old_csv_stamp, old_log_stamp = self._stamp
+        if (csv_stamp == old_csv_stamp and log_stamp and old_log_stamp
+                and log_stamp[2] == old_log_stamp[2] and log_stamp[1] >= old_log_stamp[1]):
+            # Інший процес лише дописав у той самий журнал — читаємо тільки хвіст.
+            count, _ = self._replay(self.log_path, offset=old_log_stamp[1])
+            self._log_records += count
+            self._stamp = self._file_stamp()
+            self.modified_at = self._files_mtime()
+        else:
+            self._load()
+
+    def _rotate_log(self):
+        self._log.close()
+        if os.path.exists(self.old_log_path):
+            # Попередня компакція не завершилась: не губимо її записи.
+            with open(self.old_log_path, "ab") as old, open(self.log_path, "rb") as cur:
+                old.write(cur.read())
+            os.remove(self.log_path)
+            # Новий журнал може отримати той самий inode, тож змушуємо
+            # інші процеси перечитати все, а не лише хвіст.
+            os.utime(self.csv_path)
+        elif os.path.exists(self.log_path):
+            os.replace(self.log_path, self.old_log_path)
+        self._log = open(self.log_path, "ab")
+        self._log_records = 0
+        self._stamp = self._file_stamp()
+
+    def _append(self, records):
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        self._log.write(data.encode("utf-8"))
+        self._log.flush()
+        self._log_records += len(records)
+        self._stamp = self._file_stamp()
+
+    def _replay(self, path, offset=0):
+        if not os.path.exists(path):
+            return 0, 0
+        count = 0
+        good_offset = offset
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line.decode("utf-8"))
+                except ValueError:
+                    break
+                self._apply(record)
+                good_offset += len(line)
+                count += 1
+        if good_offset != os.path.getsize(path):
+            # Обірваний запис після збою — відрізаємо хвіст.
+            with open(path, "r+b") as f:
+                f.truncate(good_offset)
+        return count, good_offset
+
+    def _apply(self, record):
+        if record["op"] == "put":
+            item = record["item"]
+            if "version" not in item:
+                item["version"] = self.version + 1
+            self._set(item)
+        elif record["op"] == "delete" and record["id"] in self.items:
+            self._unset(record["id"], record.get("v", self.version + 1))
+
+    def _bump_next_id(self, item_id):
+        try:
+            i = int(item_id)
+        except (ValueError, TypeError):
+            return
+        if i >= self.next_id:
+            self.next_id = i + 1
+
+    def _files_mtime(self):
+        mtimes = [os.path.getmtime(p) for p in (self.csv_path, self.log_path, self.old_log_path)
+                  if os.path.exists(p)]
+        return max(mtimes, default=0.0)
+
+    def _file_stamp(self):
+        stamp = []
+        for path in (self.csv_path, self.log_path):
+            try:
+                st = os.stat(path)
+                stamp.append((st.st_mtime_ns, st.st_size, st.st_ino))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _write_snapshot_tmp(self, rows):
+        # Окремий тимчасовий файл на процес, далі атомарний os.replace.
+        tmp_path = f"{self.csv_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=self.fieldnames, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+            f.flush()
+            os.fsync(f.fileno())
+        return tmp_path
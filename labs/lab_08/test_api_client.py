@@ -0,0 +1,144 @@
+import pytest
+
+import api_client
+from api_client import ApiClient
+
+
+class Resp:
+    def __init__(self, status_code=200, data=None, headers=None):
+        self.status_code = status_code
+        self.data = data
+        self.headers = headers or {}
+        self.ok = status_code < 400
+
+    def json(self):
+        return self.data
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise api_client.requests.HTTPError(str(self.status_code))
+
+
+class StubSession:
+    # Замість мережі: відповіді по черзі, виклики записуються.
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+        self.health = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append(method)
+        resp = self.responses.pop(0)
+        if isinstance(resp, Exception):
+            raise resp
+        return resp
+
+    def get(self, url, **kwargs):
+        # Перевірка /health з потоку розмикача.
+        self.calls.append("HEALTH")
+        return self.health.pop(0)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = ApiClient()
+    client.session = StubSession()
+    sleeps = client.sleeps = []
+    monkeypatch.setattr(api_client.time, "sleep", sleeps.append)
+    monkeypatch.setattr(api_client.random, "uniform", lambda a, b: b)
+    return client
+
+
+@pytest.fixture
+def no_probe(client, monkeypatch):
+    # Фоновий потік перевірки не запускаємо — розмикач лишається відкритим.
+    monkeypatch.setattr(client.breaker, "_probe_loop", lambda: None)
+    return client
+
+
+def test_local_items_stay_in_journal_when_online(client):
+    item, _ = client._create_item_offline(
+        {"name": "Стіл", "category": "Меблі", "quantity": 1, "price": 10, "location": "Склад"})
+    assert client.mode == "online"
+    updated, error = client.update_item(item["id"], {"price": 12})
+    assert error is None and updated["price"] == "12.0"
+    assert client._collapse_journal(client._load_journal())[0]["item"]["price"] == "12.0"
+    assert client.delete_item(item["id"]) is None
+    assert client.session.calls == []
+    assert client._collapse_journal(client._load_journal()) == []
+    assert client.get_cached_items() == []
+
+
+@pytest.mark.parametrize("method", ["GET", "PUT", "DELETE"])
+def test_idempotent_requests_retry_up_to_max(no_probe, method):
+    client = no_probe
+    client.session = StubSession(*[Resp(503)] * (api_client.MAX_RETRIES + 1))
+    assert client._request(method, "/items").status_code == 503
+    assert client.session.calls == [method] * (api_client.MAX_RETRIES + 1)
+    assert client.sleeps == [api_client.BACKOFF_BASE * 2 ** i for i in range(api_client.MAX_RETRIES)]
+    metrics = client.get_metrics()
+    assert metrics["retries"] == api_client.MAX_RETRIES and metrics["failures"] == 1
+
+
+def test_retry_stops_on_success(no_probe):
+    client = no_probe
+    client.session = StubSession(api_client.requests.ConnectionError(), Resp(200, []))
+    assert client._request("GET", "/items").status_code == 200
+    assert client.session.calls == ["GET", "GET"]
+    assert client.get_metrics()["failures"] == 0
+
+
+@pytest.mark.parametrize("method", ["POST", "PATCH"])
+def test_non_idempotent_requests_never_retry(no_probe, method):
+    client = no_probe
+    client.session = StubSession(api_client.requests.ConnectionError(), Resp(201))
+    with pytest.raises(api_client.requests.ConnectionError):
+        client._request(method, "/items", json={})
+    assert client.session.calls == [method]
+    assert client.sleeps == []
+    #5xx теж не повторюється
+    client.session = StubSession(Resp(502), Resp(201))
+    assert client._request(method, "/items", json={}).status_code == 502
+    assert client.session.calls == [method]
+
+
+def test_breaker_opens_after_threshold(no_probe):
+    client = no_probe
+    client.session = StubSession(*[Resp(500)] * api_client.FAILURE_THRESHOLD)
+    for _ in range(api_client.FAILURE_THRESHOLD - 1):
+        client._request("POST", "/items", json={})
+        assert client.mode == "online"
+    client._request("POST", "/items", json={})
+    assert client.mode == "offline"
+    assert client.get_metrics()["circuit_opened"] == 1
+    with pytest.raises(api_client.ServerUnavailable):
+        client._request("GET", "/items")
+    assert len(client.session.calls) == api_client.FAILURE_THRESHOLD
+
+
+def test_success_resets_failure_count(no_probe):
+    client = no_probe
+    fail = Resp(500)
+    client.session = StubSession(*[fail] * (api_client.FAILURE_THRESHOLD - 1), Resp(201), fail)
+    for _ in range(api_client.FAILURE_THRESHOLD + 1):
+        client._request("POST", "/items", json={})
+    assert client.mode == "online"
+
+
+def test_probe_closes_breaker_and_counts_reconnect(client, monkeypatch):
+    loop = client.breaker._probe_loop
+    monkeypatch.setattr(client.breaker, "_probe_loop", lambda: None)
+    client.session = StubSession(*[Resp(500)] * api_client.FAILURE_THRESHOLD)
+    for _ in range(api_client.FAILURE_THRESHOLD):
+        client._request("POST", "/items", json={})
+    assert client.mode == "offline"
+    client.session.health = [Resp(503), Resp(200)]
+    loop()
+    assert client.session.calls[-2:] == ["HEALTH", "HEALTH"]
+    #інтервал перевірки подвоюється після невдачі
+    assert client.sleeps == [api_client.PROBE_INTERVAL * 1.5, api_client.PROBE_INTERVAL * 3]
+    assert client.mode == "online"
+    assert client.get_metrics()["reconnects"] == 1
+    client.session.responses = [Resp(200, [])]
+    assert client._request("GET", "/items").status_code == 200
@@ -0,0 +1,94 @@
+import importlib.util
+import os
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    # server.py відкриває сховище в data/ поточного каталогу під час імпорту,
+    # тож вантажимо свіжий модуль у тимчасовому каталозі (під окремим ім'ям,
+    # бо server є і в lab_10).
+    monkeypatch.chdir(tmp_path)
+    spec = importlib.util.spec_from_file_location("lab_08_server", os.path.join(HERE, "server.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    yield module, module.app.test_client()
+    module.store.close()
+
+
+def get(client, path, **kwargs):
+    # Дочитуємо потокове тіло, щоб відповідь закрилась.
+    resp = client.get(path, **kwargs)
+    resp.get_data()
+    return resp
+
+
+def create(client, n):
+    for i in range(n):
+        resp = client.post("/items", json={"name": f"Товар {i}", "category": "Меблі",
+                                           "quantity": 1, "price": 10, "location": "Склад"})
+        assert resp.status_code == 201
+
+
+def test_items_default_page_and_keyset(api, monkeypatch):
+    module, client = api
+    monkeypatch.setattr(module, "DEFAULT_PAGE_SIZE", 3)
+    create(client, 5)
+    resp = client.get("/items")
+    assert [i["id"] for i in resp.get_json()] == ["1", "2", "3"]
+    assert resp.headers["X-Total-Count"] == "5"
+    resp = client.get("/items", query_string={"after_id": "3", "limit": 10})
+    assert [i["id"] for i in resp.get_json()] == ["4", "5"]
+    assert client.get("/items", query_string={"after_id": "3", "sort": "-price"}).status_code == 400
+
+
+@pytest.mark.parametrize("path", ["/items", "/export"])
+def test_etag_304_then_200_after_write(api, path):
+    _, client = api
+    create(client, 1)
+    first = get(client, path)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert get(client, path, headers={"If-None-Match": etag}).status_code == 304
+    client.put("/items/1", json={"price": 12})
+    again = get(client, path, headers={"If-None-Match": etag})
+    assert again.status_code == 200 and again.headers["ETag"] != etag
+
+
+@pytest.mark.parametrize("path", ["/items", "/export"])
+def test_if_modified_since_echo(api, path, monkeypatch):
+    module, client = api
+    clock = [1000.2]
+    monkeypatch.setattr(module.time, "time", lambda: clock[0])
+    create(client, 1)
+    #у секунду запису Last-Modified не віддається
+    assert "Last-Modified" not in get(client, path).headers
+    clock[0] = 1001.5
+    since = get(client, path).headers["Last-Modified"]
+    assert get(client, path, headers={"If-Modified-Since": since}).status_code == 304
+    client.put("/items/1", json={"price": 12})
+    resp = get(client, path, headers={"If-Modified-Since": since})
+    assert resp.status_code == 200 and "Last-Modified" not in resp.headers
+    clock[0] = 1003.0
+    resp = get(client, path, headers={"If-Modified-Since": since})
+    assert resp.status_code == 200 and resp.headers["Last-Modified"] != since
+    assert get(client, path, headers={"If-Modified-Since": resp.headers["Last-Modified"]}).status_code == 304
+
+
+def test_export_includes_log_while_other_worker_compacts(api):
+    module, client = api
+    other = module.ItemStore(module.CSV_PATH, module.FIELDNAMES)
+    assert other._compact_lock.try_exclusive()
+    try:
+        create(client, 2)
+        resp = get(client, "/export")
+    finally:
+        other.close()
+    assert resp.status_code == 200
+    assert resp.headers["Content-Disposition"] == "attachment; filename=inventory.csv"
+    lines = resp.get_data(as_text=True).splitlines()
+    assert lines[0] == ",".join(module.FIELDNAMES)
+    assert [line.split(",")[1] for line in lines[1:]] == ["Товар 0", "Товар 1"]
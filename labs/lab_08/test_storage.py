@@ -0,0 +1,211 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from storage import ItemStore
+
+FIELDNAMES = ["id", "name", "category", "quantity", "price", "location", "created_at"]
+
+
+def make_item(item_id, name="Стілець"):
+    return {
+        "id": str(item_id),
+        "name": name,
+        "category": "меблі",
+        "quantity": "1",
+        "price": "100.0",
+        "location": "склад",
+        "created_at": "2025-01-01T00:00:00",
+    }
+
+
+def test_changes_survive_restart(tmp_path):      #зміни з журналу відновлюються після перезапуску
+    path = str(tmp_path / "inventory.csv")
+    store = ItemStore(path, FIELDNAMES)
+    store.put(make_item(1))
+    store.put(make_item(2))
+    store.put(make_item(1, name="Стіл"))
+    store.delete("2")
+    store.close()
+
+    reopened = ItemStore(path, FIELDNAMES)
+    assert reopened.all() == [dict(make_item(1, name="Стіл"), version=3)]
+
+
+def test_compaction_writes_snapshot_and_truncates_log(tmp_path):
+    path = tmp_path / "inventory.csv"
+    store = ItemStore(str(path), FIELDNAMES, compact_threshold=3)
+    for i in range(1, 8):
+        store.put(make_item(i))
+    store.compact()
+    store.close()
+
+    assert path.read_text(encoding="utf-8").count("\n") == 8
+    assert (tmp_path / "inventory.csv.log").read_text(encoding="utf-8") == ""
+    assert not (tmp_path / "inventory.csv.log.old").exists()
+    assert [i["id"] for i in ItemStore(str(path), FIELDNAMES).all()] == [str(i) for i in range(1, 8)]
+
+
+def test_torn_log_tail_is_dropped(tmp_path):      #обірваний останній запис не ламає завантаження
+    path = str(tmp_path / "inventory.csv")
+    store = ItemStore(path, FIELDNAMES)
+    store.put(make_item(1))
+    store.close()
+    with open(path + ".log", "a", encoding="utf-8") as f:
+        f.write('{"op": "put", "item": {"id": "2"')
+
+    reopened = ItemStore(path, FIELDNAMES)
+    reopened.put(make_item(3))
+    reopened.close()
+    assert [i["id"] for i in ItemStore(path, FIELDNAMES).all()] == ["1", "3"]
+
+
+def test_next_id_is_monotonic(tmp_path):      #id не перевикористовується після видалення
+    store = ItemStore(str(tmp_path / "inventory.csv"), FIELDNAMES)
+    first = store.create(make_item(0))
+    second = store.create(make_item(0))
+    store.delete(second["id"])
+    third = store.create(make_item(0))
+    assert (first["id"], second["id"], third["id"]) == ("1", "2", "3")
+
+
+def test_external_file_change_is_picked_up(tmp_path):
+    path = str(tmp_path / "inventory.csv")
+    store = ItemStore(path, FIELDNAMES)
+    store.create(make_item(0))
+
+    other = ItemStore(path, FIELDNAMES)
+    other.create(make_item(0, name="Шафа"))
+    other.close()
+
+    assert store.get("2")["name"] == "Шафа"
+    assert store.create(make_item(0))["id"] == "3"
+
+
+def _create_many(path, count):
+    store = ItemStore(path, FIELDNAMES, compact_threshold=500)
+    ids = [store.create(make_item(0))["id"] for _ in range(count)]
+    store.close()
+    return ids
+
+
+def test_concurrent_creates_do_not_lose_or_duplicate_ids(tmp_path):      #стрес-тест: потоки і процеси пишуть одночасно
+    path = str(tmp_path / "inventory.csv")
+    store = ItemStore(path, FIELDNAMES, compact_threshold=500)
+
+    with ProcessPoolExecutor(max_workers=4) as processes, ThreadPoolExecutor(max_workers=16) as threads:
+        futures = [processes.submit(_create_many, path, 500) for _ in range(4)]
+        thread_ids = list(threads.map(lambda _: store.create(make_item(0))["id"], range(2000)))
+        process_ids = [i for f in futures for i in f.result()]
+
+    created = thread_ids + process_ids
+    assert len(set(created)) == len(created) == 4000
+    assert {i["id"] for i in store.all()} == set(created)
+    store.close()
+    assert {i["id"] for i in ItemStore(path, FIELDNAMES).all()} == set(created)
+
+
+def test_query_filters_sorts_and_pages(tmp_path):
+    store = ItemStore(str(tmp_path / "inventory.csv"), FIELDNAMES)
+    for name, category, price in [("Стіл", "меблі", "300"), ("Лампа", "світло", "50"),
+                                  ("Стілець", "Меблі", "120"), ("Шафа", "меблі", "900")]:
+        store.create(dict(make_item(0, name=name), category=category, price=price))
+
+    total, rows = store.query(category="меблі", sort="price", reverse=True, offset=1, limit=1)
+    assert total == 3
+    assert [r["name"] for r in rows] == ["Стіл"]
+
+    total, rows = store.query(name="стіл", sort="price")
+    assert (total, [r["name"] for r in rows]) == (2, ["Стілець", "Стіл"])
+
+
+def test_secondary_indexes_follow_updates_and_deletes(tmp_path):      #індекси оновлюються інкрементально
+    store = ItemStore(str(tmp_path / "inventory.csv"), FIELDNAMES)
+    chair = store.create(dict(make_item(0), price="120"))
+    table = store.create(dict(make_item(0, name="Стіл"), price="300"))
+    store.put(dict(chair, category="Садові", location="двір", price="80"))
+    store.delete(table["id"])
+    store.create(dict(make_item(0, name="Шафа"), price="900"))
+
+    total, rows = store.query(category="садові", location="Двір")
+    assert (total, [r["name"] for r in rows]) == (1, ["Стілець"])
+    assert store.query(category="меблі")[0] == 1
+    total, rows = store.query(min_price=50, max_price=500)
+    assert [r["price"] for r in rows] == ["80"]
+    assert store.by_price == [(80.0, "1"), (900.0, "3")]
+
+
+def test_batches_are_all_or_nothing(tmp_path):      #пакет з відсутнім id не змінює нічого
+    path = str(tmp_path / "inventory.csv")
+    store = ItemStore(path, FIELDNAMES)
+    created = store.create_many([make_item(0, name=n) for n in ("Стіл", "Шафа", "Лава")])
+    assert [i["id"] for i in created] == ["1", "2", "3"]
+
+    updated, missing = store.update_many([("1", {"price": "5.0"}), ("9", {"price": "7.0"})])
+    assert (updated, missing) == (None, ["9"])
+    assert store.delete_many(["2", "9"]) == ["9"]
+    assert len(store.all()) == 3
+
+    updated, _ = store.update_many([("1", {"price": "5.0"}), ("2", {"quantity": "4"})])
+    assert [(i["price"], i["quantity"]) for i in updated] == [("5.0", "1"), ("100.0", "4")]
+    assert store.delete_many(["2", "3"]) == []
+    store.close()
+    assert [(i["id"], i["price"]) for i in ItemStore(path, FIELDNAMES).all()] == [("1", "5.0")]
+
+
+def test_change_feed_survives_compaction(tmp_path):      #стрічка змін і версії переживають компакцію та перезапуск
+    path = str(tmp_path / "inventory.csv")
+    store = ItemStore(path, FIELDNAMES)
+    store.create_many([make_item(0, name=n) for n in ("Стіл", "Шафа", "Лава")])
+    seen = store.version
+    store.update("1", {"price": "5.0"})
+    store.delete("2")
+    store.compact()
+    store.close()
+
+    reopened = ItemStore(path, FIELDNAMES)
+    feed = reopened.changes_since(seen)
+    assert feed["version"] == 5
+    assert [(c["op"], c["id"], c["version"]) for c in feed["changes"]] == [("put", "1", 4), ("delete", "2", 5)]
+    assert reopened.get("3")["version"] == 3
+
+
+def test_apply_changes_detects_conflicts(tmp_path):
+    store = ItemStore(str(tmp_path / "inventory.csv"), FIELDNAMES)
+    store.create_many([make_item(0), make_item(0)])
+    store.update("1", {"price": "7.0"})
+
+    result = store.apply_changes([
+        {"op": "update", "id": "1", "base_version": 1, "item": {"price": "1.0"}},
+        {"op": "delete", "id": "2", "base_version": 2},
+        {"op": "update", "id": "9", "base_version": 1, "item": {}},
+        {"op": "create", "ref": "local-1", "item": make_item(0, name="Шафа")},
+    ])
+    assert [r["status"] for r in result["results"]] == ["conflict", "applied", "not_found", "applied"]
+    assert result["results"][3]["item"]["id"] == "3"
+    assert store.get("1")["price"] == "7.0"
+    assert [(c["op"], c["id"]) for c in store.changes_since(3)["changes"]] == [("put", "3"), ("delete", "2")]
+
+
+def test_change_feed_limit_resumes_from_last_change(tmp_path):
+    store = ItemStore(str(tmp_path / "inventory.csv"), FIELDNAMES)
+    store.create_many([make_item(0) for _ in range(5)])
+    feed = store.changes_since(0, limit=2)
+    assert [c["version"] for c in feed["changes"]] == [1, 2]
+    assert feed["version"] == 2 and feed["more"]
+    feed = store.changes_since(feed["version"], limit=3)
+    assert [c["version"] for c in feed["changes"]] == [3, 4, 5]
+    assert feed["version"] == 5 and not feed["more"]
+
+
+def test_keyset_pages_survive_deletes(tmp_path):      #видалення на першій сторінці не ховає рядків наступної
+    store = ItemStore(str(tmp_path / "inventory.csv"), FIELDNAMES)
+    store.create_many([make_item(0) for _ in range(12)])
+    _, rows = store.query(sort="id", limit=5)
+    seen = [r["id"] for r in rows]
+    store.delete("2")
+    while True:
+        _, rows = store.query(limit=5, after_id=seen[-1])
+        page = [r["id"] for r in rows]
+        seen.extend(page)
+        if len(page) < 5:
+            break
+    assert seen == [str(i) for i in range(1, 13)]
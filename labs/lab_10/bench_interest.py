@@ -0,0 +1,87 @@
+import argparse
+import json
+import random
+import time
+
+import server
+from outbox import Outbox
+
+
+def setup(players, side, radius, rnd):
+    server.configure(tick=20, radius=radius, limit=1 << 20)
+    server.outboxes.clear()
+    server.by_user.clear()
+    server.positions.clear()
+    server.dirty.clear()
+    names = [f"p{i}" for i in range(players)]
+    for name in names:
+        # Ключ клієнта — саме ім'я, замість сокета черга в пам'яті.
+        server.outboxes[name] = Outbox(limit=1 << 20)
+        server.by_user[name] = name
+    coords = {name: [rnd.uniform(0, side), rnd.uniform(0, side)] for name in names}
+    return names, coords
+
+
+def run_tick(names, coords, side, rnd):
+    # Кожен гравець робить крок, далі один тік; повертаємо час і байти кадрів.
+    start = time.perf_counter()
+    for name in names:
+        pos = coords[name]
+        pos[0] = min(side, max(0.0, pos[0] + rnd.uniform(-2, 2)))
+        pos[1] = min(side, max(0.0, pos[1] + rnd.uniform(-2, 2)))
+        raw = json.dumps({"type": "position", "user": name, "x": pos[0], "y": pos[1]}).encode("utf-8")
+        server.handle_message(name, raw, name)
+    moved = time.perf_counter()
+    server.flush_positions()
+    flushed = time.perf_counter()
+    sent = sum(len(m) for box in server.outboxes.values() for m in box.take())
+    return moved - start, flushed - moved, sent
+
+
+def measure(players, side, radius, ticks, seed=1):
+    rnd = random.Random(seed)
+    names, coords = setup(players, side, radius, rnd)
+    run_tick(names, coords, side, rnd)
+    move_time = flush_time = sent = 0
+    for _ in range(ticks):
+        m, f, s = run_tick(names, coords, side, rnd)
+        move_time += m
+        flush_time += f
+        sent += s
+    neighbours = 0
+    if server.grid is not None:
+        neighbours = sum(len(server.grid.near(*coords[n], radius)) - 1 for n in names) / players
+    return move_time / ticks, flush_time / ticks, sent / ticks, neighbours
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Вартість тіку з фільтрацією за радіусом")
+    parser.add_argument("--players", type=int, nargs="+", default=[500, 1000, 2000, 4000])
+    parser.add_argument("--radius", type=float, default=50)
+    parser.add_argument("--density", type=float, default=2, help="гравців на коло радіуса")
+    parser.add_argument("--ticks", type=int, default=5)
+    args = parser.parse_args()
+
+    # Щільність стала: площа світу росте разом з кількістю гравців. Для
+    # порівняння — той самий світ без фільтра (radius=0: кадр для всіх).
+    area = 3.14159 * args.radius ** 2 / args.density
+    print(f"{'players':>8} {'side':>7} {'radius':>7} {'move, ms':>9} {'flush, ms':>10} "
+          f"{'KB/tick':>10} {'neighbours':>11}")
+    for players in args.players:
+        side = (players * area) ** 0.5
+        for radius in (args.radius, 0):
+            move, flush, sent, neighbours = measure(players, side, radius, args.ticks)
+            print(f"{players:>8} {side:>7.0f} {radius or '-':>7} {move * 1000:>9.1f} {flush * 1000:>10.1f} "
+                  f"{sent / 1024:>10.0f} {neighbours:>11.1f}")
+
+    # Світ фіксований, гравців більшає — росте й щільність, а з нею вартість.
+    side = (args.players[0] * area) ** 0.5
+    print(f"\nфіксований світ {side:.0f}x{side:.0f}")
+    for players in args.players:
+        move, flush, sent, neighbours = measure(players, side, args.radius, args.ticks)
+        print(f"{players:>8} {side:>7.0f} {args.radius:>7} {move * 1000:>9.1f} {flush * 1000:>10.1f} "
+              f"{sent / 1024:>10.0f} {neighbours:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SERVER_CODE = {
+    "thread": "import server; server.settings.update({settings}); server.start('127.0.0.1', {port})",
+    "async": "import asyncio, server; server.settings.update({settings}); "
+             "asyncio.run(server.start_async('127.0.0.1', {port}))",
+}
+SLOW_RCVBUF = 4096
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, port, settings):
+    code = SERVER_CODE[mode].format(port=port, settings=settings)
+    proc = subprocess.Popen([sys.executable, "-c", code],
+                            cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("сервер не запустився")
+
+
+def process_stats(pid):
+    # RSS і кількість потоків сервера (лише Linux).
+    stats = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "Threads"):
+                    stats[key] = value.strip()
+    except OSError:
+        pass
+    return stats
+
+
+async def open_slow(port):
+    # Повільний клієнт: крихітний буфер прийому, нічого не читає.
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SLOW_RCVBUF)
+    sock.setblocking(False)
+    await asyncio.get_running_loop().sock_connect(sock, ("127.0.0.1", port))
+    return await asyncio.open_connection(sock=sock)
+
+
+async def load(port, n, messages, timeout, slow=0, probe=None, pad=0):
+    sem = asyncio.Semaphore(200)
+
+    async def connect(i, opener):
+        async with sem:
+            try:
+                reader, writer = await asyncio.wait_for(opener(), 10)
+            except (OSError, asyncio.TimeoutError):
+                return None
+            writer.write(f"bot{i}\n".encode("utf-8"))
+            return reader, writer
+
+    start = time.perf_counter()
+    fast = lambda: asyncio.open_connection("127.0.0.1", port)
+    conns = [c for c in await asyncio.gather(*(connect(i, fast) for i in range(n))) if c]
+    connect_time = time.perf_counter() - start
+    stalled = [c for c in await asyncio.gather(*(connect(n + i, lambda: open_slow(port)) for i in range(slow))) if c]
+
+    counts = {"lines": 0, "bytes": 0, "updates": 0, "finals": 0}
+    latencies = []
+    last_y = float(messages - 1)
+
+    def seen(user, name, x, y):
+        # x у повідомленні — момент відправки (perf_counter цього процесу).
+        if user != name:
+            counts["updates"] += 1
+            latencies.append(time.perf_counter() - x)
+            if y == last_y:
+                counts["finals"] += 1
+
+    async def read(reader, name):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                counts["lines"] += 1
+                counts["bytes"] += len(line)
+                if b'"position"' in line:
+                    msg = json.loads(line)
+                    seen(msg["user"], name, msg["x"], msg["y"])
+                elif b'"positions"' in line:
+                    for user, (x, y) in json.loads(line)["users"].items():
+                        seen(user, name, x, y)
+        except (ConnectionError, ValueError):
+            pass
+
+    readers = [asyncio.create_task(read(r, f"bot{i}")) for i, (r, _) in enumerate(conns)]
+    # Чекаємо, поки дійдуть усі сповіщення про підключення.
+    settled = -1
+    while settled != counts["lines"]:
+        settled = counts["lines"]
+        await asyncio.sleep(0.5)
+    base = dict(counts)
+
+    latencies.clear()
+    start = time.perf_counter()
+    for k in range(messages):
+        for i, (_, writer) in enumerate(conns):
+            if writer.is_closing():
+                continue
+            msg = {"type": "position", "user": f"bot{i}", "x": time.perf_counter(), "y": float(k)}
+            if pad:
+                msg["pad"] = "." * pad
+            writer.write(json.dumps(msg).encode("utf-8") + b"\n")
+        await asyncio.gather(*(w.drain() for _, w in conns), return_exceptions=True)
+    expected = len(conns) * (len(conns) - 1) * messages
+    expected_finals = len(conns) * (len(conns) - 1)
+    # Чекаємо, поки кожен отримає останню позицію кожного, або, якщо частину
+    # відкинуто, поки потік не стихне.
+    deadline = time.perf_counter() + timeout
+    last, last_time = -1, time.perf_counter()
+    while counts["finals"] < expected_finals and time.perf_counter() < deadline:
+        if counts["lines"] != last:
+            last, last_time = counts["lines"], time.perf_counter()
+        elif time.perf_counter() - last_time > 1:
+            break
+        await asyncio.sleep(0.01)
+    done = counts["finals"] >= expected_finals
+    elapsed = (time.perf_counter() if done else last_time) - start
+    stats = probe() if probe else {}
+
+    for _, writer in conns + stalled:
+        writer.close()
+    for task in readers:
+        task.cancel()
+    await asyncio.gather(*readers, return_exceptions=True)
+    latencies.sort()
+    result = {k: counts[k] - base[k] for k in counts}
+    result.update(connected=len(conns), connect_time=connect_time, expected=expected,
+                  expected_finals=expected_finals, elapsed=elapsed, stats=stats,
+                  p50=latencies[len(latencies) // 2] if latencies else float("nan"),
+                  p99=latencies[len(latencies) * 99 // 100] if latencies else float("nan"))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Навантажувальний тест сервера lab_10")
+    parser.add_argument("--clients", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--messages", type=int, default=3, help="позицій від кожного клієнта")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--modes", nargs="+", default=["thread", "async"], choices=list(SERVER_CODE))
+    parser.add_argument("--slow", type=int, default=0, help="клієнтів, що не читають")
+    parser.add_argument("--pad", type=int, default=0, help="додаткових байтів у кожній позиції")
+    parser.add_argument("--policy", default="coalesce")
+    parser.add_argument("--queue-limit", type=int, default=256)
+    parser.add_argument("--tick", type=float, default=0, help="частота тіків сервера, 0 — без тіків")
+    args = parser.parse_args()
+    settings = {"policy": args.policy, "limit": args.queue_limit, "tick": args.tick}
+
+    # updates — доставлені позиції інших, final — частка пар (отримувач,
+    # відправник), що побачили останню позицію, lines/MB — прийняті рядки й байти.
+    print(f"{'mode':>7} {'clients':>8} {'connected':>10} {'connect, s':>11} {'updates':>16} {'final':>7} "
+          f"{'lines':>9} {'MB':>7} {'time, s':>8} {'p50, ms':>8} {'p99, ms':>8} {'RSS':>11} {'threads':>8}")
+    for n in args.clients:
+        for mode in args.modes:
+            port = free_port()
+            proc = start_server(mode, port, settings)
+            try:
+                r = asyncio.run(load(port, n, args.messages, args.timeout, args.slow,
+                                     lambda: process_stats(proc.pid), args.pad))
+            finally:
+                proc.kill()
+                proc.wait()
+            final = r["finals"] / r["expected_finals"] if r["expected_finals"] else 1.0
+            print(f"{mode:>7} {n:>8} {r['connected']:>10} {r['connect_time']:>11.2f} "
+                  f"{r['updates']:>7}/{r['expected']:<8} {final:>7.1%} {r['lines']:>9} "
+                  f"{r['bytes'] / 1e6:>7.2f} {r['elapsed']:>8.2f} "
+                  f"{r['p50'] * 1000:>8.1f} {r['p99'] * 1000:>8.1f} "
+                  f"{r['stats'].get('VmRSS', '?'):>11} {r['stats'].get('Threads', '?'):>8}")
+
+
+if __name__ == "__main__":
+    main()
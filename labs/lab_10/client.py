@@ -5,7 +5,7 @@ import json
 SERVER_HOST = "127.0.0.1"
 SERVER_PORT = 5000
 
-def listen(sock):
+def listen(sock, username):
     while True:
         try:
             data = sock.recv(1024)
@@ -21,6 +21,15 @@ def listen(sock):
                 if msg["type"] == "position":
                     print(f"[POS] {msg['user']}: ({msg['x']}, {msg['y']})")
 
+                # Сервер у режимі тіків шле зміни позицій пакетом
+                if msg["type"] == "positions":
+                    for user, (x, y) in msg["users"].items():
+                        if user != username:
+                            print(f"[POS] {user}: ({x}, {y})")
+                    # Гравці, що вийшли з радіуса видимості
+                    for user in msg.get("gone", []):
+                        print(f"[OUT] {user}")
+
                 if msg["type"] == "message":
                     print(f"[{msg['user']}] {msg['text']}")
 
@@ -35,7 +44,7 @@ def main():
 
     sock.send((username + "\n").encode("utf-8"))
 
-    threading.Thread(target=listen, args=(sock,), daemon=True).start()
+    threading.Thread(target=listen, args=(sock, username), daemon=True).start()
 
     print("Команди:")
     print("/move x y  - надіслати координати")
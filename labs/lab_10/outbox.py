@@ -0,0 +1,107 @@
+from collections import deque
+import threading
+
+QUEUE_LIMIT = 256
+POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+
+class Outbox:
+    # Обмежена черга вихідних повідомлень одного клієнта. broadcast лише
+    # кладе сюди готові байти, а відправляє окремий писач (потік або
+    # задача asyncio), тож повільний клієнт не гальмує інших. Коли черга
+    # повна, діє політика:
+    #   drop_oldest — викидаємо найстаріше повідомлення;
+    #   coalesce    — повідомлення з ключем (позиція користувача) замінює
+    #                 ще не надіслане з тим самим ключем, інакше як drop_oldest;
+    #   disconnect  — закриваємо чергу, сервер відключає клієнта.
+
+    def __init__(self, limit=QUEUE_LIMIT, policy="coalesce"):
+        if policy not in POLICIES:
+            raise ValueError(f"Невідома політика: {policy}")
+        self.limit = limit
+        self.policy = policy
+        self.queue = deque()
+        self.latest = {}
+        self.closed = False
+        self.overflowed = False
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.ready = threading.Condition()
+        # Режим asyncio: писач чекає на asyncio.Event, а поки черга порожня і
+        # транспорт встигає, direct(message) пише одразу й повертає True.
+        self.event = None
+        self.direct = None
+
+    def __len__(self):
+        return len(self.queue)
+
+    def put(self, message, key=None):
+        with self.ready:
+            if self.closed:
+                return False
+            if self.direct is not None and not self.queue and self.direct(message):
+                self.sent += 1
+                return True
+            if key is not None and self.policy == "coalesce":
+                entry = self.latest.get(key)
+                if entry is not None:
+                    entry[1] = message
+                    self.coalesced += 1
+                    return True
+            if len(self.queue) >= self.limit:
+                if self.policy == "disconnect":
+                    self.overflowed = True
+                    self._close()
+                    added = False
+                else:
+                    self._forget(self.queue.popleft())
+                    self.dropped += 1
+            if not self.closed:
+                entry = [key, message]
+                self.queue.append(entry)
+                if key is not None:
+                    self.latest[key] = entry
+                if len(self.queue) > self.max_depth:
+                    self.max_depth = len(self.queue)
+                self.ready.notify()
+                added = True
+        if self.event is not None:
+            self.event.set()
+        return added
+
+    def take(self):
+        # Усе, що накопичилось, одним пакетом — один send на кілька повідомлень.
+        with self.ready:
+            batch = [message for _, message in self.queue]
+            self.queue.clear()
+            self.latest.clear()
+            self.sent += len(batch)
+            return batch
+
+    def wait(self):
+        # Потоковий писач: чекаємо повідомлень; порожній список — черга закрита.
+        with self.ready:
+            while not self.queue and not self.closed:
+                self.ready.wait()
+            return self.take()
+
+    def close(self):
+        with self.ready:
+            self._close()
+        if self.event is not None:
+            self.event.set()
+
+    def _close(self):
+        self.closed = True
+        self.ready.notify_all()
+
+    def _forget(self, entry):
+        key = entry[0]
+        if key is not None and self.latest.get(key) is entry:
+            del self.latest[key]
+
+    def metrics(self):
+        return {"depth": len(self.queue), "max_depth": self.max_depth, "sent": self.sent,
+                "dropped": self.dropped, "coalesced": self.coalesced}
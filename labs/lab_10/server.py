@@ -1,34 +1,324 @@
+import argparse
+import asyncio
 import socket
 import threading
 import json
+import math
+import time
+import traceback
+
+from outbox import POLICIES, QUEUE_LIMIT, Outbox
+from spatial import SpatialGrid
 
 HOST = "0.0.0.0"
 PORT = 5000
+BACKLOG = 4096
+# Скільки байтів може лежати в буфері транспорту asyncio, перш ніж
+# повідомлення підуть у чергу клієнта.
+DIRECT_LIMIT = 64 * 1024
+
+clients = {}
+positions = {}
+outboxes = {}
+by_user = {}
+# Користувачі, чия позиція змінилась з останнього тіку.
+dirty = set()
+# Сітка для фільтрації за відстанню; None — позиції отримують усі.
+grid = None
+# Кого бачить кожен гравець (симетрично); оновлюється при кожному його русі.
+visible = {}
+interest_lock = threading.Lock()
+settings = {"limit": QUEUE_LIMIT, "policy": "coalesce", "tick": 0, "radius": 0}
+totals = {"slow_disconnects": 0, "ticks": 0, "frames": 0}
+
+def configure(**options):
+    global grid
+    settings.update(options)
+    grid = SpatialGrid(settings["radius"]) if settings["radius"] else None
+    visible.clear()
+
+def update_interest(username):
+    # Після руху username: хто тепер у радіусі, хто щойно увійшов і хто вийшов.
+    # Множини visible лишаються симетричними.
+    pos = grid.position(username)
+    if pos is None:
+        return set(), set(), set()
+    near = set(grid.near(*pos, settings["radius"]))
+    near.discard(username)
+    with interest_lock:
+        old = visible.get(username, set())
+        entered, left = near - old, old - near
+        visible[username] = near
+        for other in entered:
+            visible.setdefault(other, set()).add(username)
+        for other in left:
+            seen = visible.get(other)
+            if seen is not None:
+                seen.discard(username)
+    return near, entered, left
+
+def forget_interest(username):
+    # Гравець пішов: прибираємо його з чужих множин, повертаємо, кому сказати.
+    with interest_lock:
+        seen = visible.pop(username, set())
+        for other in seen:
+            visible.get(other, set()).discard(username)
+    return seen
+
+def interest_frame(users, gone=(), tick=None):
+    frame = {"type": "positions"}
+    if tick is not None:
+        frame["tick"] = tick
+    frame["users"] = users
+    if gone:
+        frame["gone"] = sorted(gone)
+    return frame
+
+def broadcast(data, exclude_client=None, key=None):
+    # Серіалізуємо один раз і лише кладемо в черги — відправляють писачі.
+    message = json.dumps(data).encode("utf-8") + b"\n"
+    for client, outbox in list(outboxes.items()):
+        if client is not exclude_client:
+            deliver(client, outbox, message, key)
+
+def deliver(client, outbox, message, key=None):
+    if not outbox.put(message, key) and outbox.overflowed:
+        # Політика disconnect: рвемо з'єднання, писач може висіти в send.
+        disconnect(client)
 
-clients = {}          
-positions = {}        
+def send_to(username, data, key=None):
+    client = by_user.get(username)
+    outbox = outboxes.get(client)
+    if outbox is not None:
+        deliver(client, outbox, json.dumps(data).encode("utf-8") + b"\n", key)
 
-def broadcast(data, exclude_client=None):
-    message = json.dumps(data).encode("utf-8")
-    for client in clients:
-        if client != exclude_client:
+def disconnect(client):
+    if isinstance(client, asyncio.StreamWriter):
+        client.transport.abort()
+    else:
+        try:
+            client.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+def metrics():
+    boxes = list(outboxes.values())
+    depths = [len(box) for box in boxes]
+    return {
+        "clients": len(boxes),
+        "queued": sum(depths),
+        "max_depth": max(depths, default=0),
+        "peak_depth": max((box.max_depth for box in boxes), default=0),
+        "dropped": sum(box.dropped for box in boxes),
+        "coalesced": sum(box.coalesced for box in boxes),
+        "slow_disconnects": totals["slow_disconnects"],
+        "ticks": totals["ticks"],
+        "frames": totals["frames"],
+    }
+
+def report_metrics(interval):
+    while True:
+        time.sleep(interval)
+        print("[METRICS] " + " ".join(f"{k}={v}" for k, v in metrics().items()))
+
+def handle_message(username, raw, sender):
+    try:
+        msg = json.loads(raw.decode("utf-8"))
+    except:
+        return
+    if not isinstance(msg, dict):
+        return
+
+    if msg.get("type") == "position":
+        if "x" not in msg or "y" not in msg:
+            return
+        if grid is not None:
             try:
-                client.send(message + b"\n")
-            except:
-                pass
+                x, y = float(msg["x"]), float(msg["y"])
+            except (TypeError, ValueError):
+                return
+            if not (math.isfinite(x) and math.isfinite(y)):
+                return
+            grid.move(username, x, y)
+        positions[username] = (msg["x"], msg["y"])
+        if settings["tick"]:
+            # Режим тіків: лише запам'ятовуємо, розсилає flush_positions.
+            dirty.add(username)
+        elif grid is not None:
+            # Лише тим, хто в радіусі від нового місця; сам гравець дізнається
+            # позиції тих, хто з'явився поруч, і хто зник з радіуса.
+            near, entered, left = update_interest(username)
+            # Вхід і вихід з радіуса йдуть під тим самим ключем, що й позиція
+            # гравця: під coalesce пізніша позиція не опиниться в черзі перед
+            # старішим gone, а gone — перед старішою позицією.
+            for other in near:
+                send_to(other, msg, key=("position", username))
+            for other in entered:
+                pos = positions.get(other)
+                if pos is not None:
+                    send_to(username, interest_frame({other: pos}), key=("position", other))
+            for other in left:
+                send_to(username, interest_frame({}, [other]), key=("position", other))
+                send_to(other, interest_frame({}, [username]), key=("position", username))
+        else:
+            broadcast(msg, exclude_client=sender, key=("position", username))
 
-def handle_client(conn):
+    if msg.get("type") == "message":
+        broadcast(msg, exclude_client=sender)
+
+def join(client, username, outbox):
+    clients[client] = username
+    outboxes[client] = outbox
+    by_user[username] = client
+
+    print(f"[JOIN] {username} підключився.")
+
+    # Сповіщаємо інших
+    broadcast({"type": "message",
+               "user": "SERVER",
+               "text": f"{username} підключився."},
+              exclude_client=client)
+
+def leave(client):
+    username = clients.get(client, "unknown")
+    print(f"[LEAVE] {username} відключився.")
+
+    clients.pop(client, None)
+    outbox = outboxes.pop(client, None)
+    if outbox is not None:
+        outbox.close()
+        if outbox.overflowed:
+            totals["slow_disconnects"] += 1
+    if by_user.get(username) is client:
+        del by_user[username]
+        positions.pop(username, None)
+        if grid is not None:
+            grid.remove(username)
+            for other in forget_interest(username):
+                send_to(other, interest_frame({}, [username]), key=("position", username))
+
+    broadcast({"type": "message",
+               "user": "SERVER",
+               "text": f"{username} відключився."})
+
+def flush_positions():
+    # Один кадр змінених позицій на тік для всіх клієнтів. Позиції читаються
+    # після очищення dirty, тож зміна під час тіку не загубиться: у гіршому
+    # разі вона піде і в цьому, і в наступному кадрі.
+    totals["ticks"] += 1
+    if not dirty:
+        return
+    changed = list(dirty)
+    dirty.difference_update(changed)
+    users = {}
+    for username in changed:
+        pos = positions.get(username)
+        if pos is not None:
+            users[username] = pos
+    if not users:
+        return
+    if grid is None:
+        totals["frames"] += 1
+        broadcast({"type": "positions", "tick": totals["ticks"], "users": users})
+        return
+
+    # Радіус симетричний: кому видно зміненого — ті, хто в колі навколо нього.
+    # Кожен отримувач має свій кадр лише зі своїми сусідами; запис кожного
+    # гравця серіалізується один раз, кадри склеюються з готових шматків.
+    # Той, хто рушив, отримує й позиції нерухомих гравців, що опинились у
+    # радіусі, а обидва боки пари, що розійшлась, — запис gone.
+    frames = {}
+    gone = {}
+    parts = {}
+
+    def part(name, pos):
+        p = parts.get(name)
+        if p is None:
+            p = parts[name] = f"{json.dumps(name)}: {json.dumps(pos)}"
+        return p
+
+    def add(other, p):
+        frame = frames.get(other)
+        if frame is None:
+            frames[other] = [p]
+        else:
+            frame.append(p)
+
+    for username, pos in users.items():
+        near, entered, left = update_interest(username)
+        for other in near:
+            add(other, part(username, pos))
+        for other in entered:
+            # Рухомий other сам потрапить до username через свій near.
+            # leave() з іншого потоку може прибрати позицію будь-якої миті.
+            if other not in users:
+                other_pos = positions.get(other)
+                if other_pos is not None:
+                    add(username, part(other, other_pos))
+        for other in left:
+            gone.setdefault(username, []).append(other)
+            gone.setdefault(other, []).append(username)
+
+    tick = totals["ticks"]
+    head = f'{{"type": "positions", "tick": {tick}, "users": {{'
+    for other in frames.keys() | gone.keys():
+        client = by_user.get(other)
+        outbox = outboxes.get(client)
+        if outbox is None:
+            continue
+        frame = head + ", ".join(frames.get(other, ())) + "}"
+        if other in gone:
+            frame += f', "gone": {json.dumps(sorted(gone[other]))}'
+        totals["frames"] += 1
+        deliver(client, outbox, (frame + "}\n").encode("utf-8"))
+
+def safe_flush():
+    # Помилка одного тіку не повинна зупинити розсилку позицій назавжди.
     try:
-        username = conn.recv(1024).decode("utf-8").strip()
-        clients[conn] = username
+        flush_positions()
+    except Exception:
+        traceback.print_exc()
 
-        print(f"[JOIN] {username} підключився.")
+def tick_loop(hz):
+    interval = 1 / hz
+    deadline = time.monotonic()
+    while True:
+        deadline += interval
+        time.sleep(max(0, deadline - time.monotonic()))
+        safe_flush()
 
-        # Сповіщаємо інших
-        broadcast({"type": "message",
-                   "user": "SERVER",
-                   "text": f"{username} підключився."},
-                  exclude_client=conn)
+async def tick_loop_async(hz):
+    interval = 1 / hz
+    loop = asyncio.get_running_loop()
+    deadline = loop.time()
+    while True:
+        deadline += interval
+        await asyncio.sleep(max(0, deadline - loop.time()))
+        safe_flush()
+
+def new_outbox():
+    return Outbox(settings["limit"], settings["policy"])
+
+def write_loop(conn, outbox):
+    # Писач потокового режиму: пакетами з черги, поки її не закрили.
+    try:
+        while True:
+            batch = outbox.wait()
+            if not batch:
+                break
+            conn.sendall(b"".join(batch))
+    except OSError:
+        pass
+    finally:
+        outbox.close()
+
+def handle_client(conn):
+    outbox = new_outbox()
+    writer = threading.Thread(target=write_loop, args=(conn, outbox), daemon=True)
+    try:
+        username = conn.recv(1024).decode("utf-8").strip()
+        join(conn, username, outbox)
+        writer.start()
 
         while True:
             data = conn.recv(1024)
@@ -36,41 +326,121 @@ def handle_client(conn):
                 break
 
             for raw in data.splitlines():
-                try:
-                    msg = json.loads(raw.decode("utf-8"))
-                except:
-                    continue
+                handle_message(username, raw, conn)
 
-                if msg["type"] == "position":
-                    positions[username] = (msg["x"], msg["y"])
-                    broadcast(msg, exclude_client=conn)
+    except OSError:
+        pass
 
-                if msg["type"] == "message":
-                    broadcast(msg, exclude_client=conn)
+    finally:
+        leave(conn)
+        disconnect(conn)
+        if writer.is_alive():
+            writer.join()
+        conn.close()
 
+async def write_loop_async(writer, outbox):
+    try:
+        while True:
+            await outbox.event.wait()
+            outbox.event.clear()
+            batch = outbox.take()
+            if batch:
+                writer.write(b"".join(batch))
+                await writer.drain()
+            if outbox.closed:
+                break
+    except ConnectionError:
+        pass
     finally:
-        username = clients.get(conn, "unknown")
-        print(f"[LEAVE] {username} відключився.")
+        outbox.close()
+        writer.close()
 
-        clients.pop(conn, None)
-        positions.pop(username, None)
+def direct_write(writer):
+    transport = writer.transport
 
-        broadcast({"type": "message",
-                   "user": "SERVER",
-                   "text": f"{username} відключився."})
+    def write(message):
+        if transport.is_closing() or transport.get_write_buffer_size() >= DIRECT_LIMIT:
+            return False
+        writer.write(message)
+        return True
 
-        conn.close()
+    return write
+
+async def handle_client_async(reader, writer):
+    # Той самий протокол: перший рядок — ім'я, далі JSON по рядку.
+    outbox = new_outbox()
+    outbox.event = asyncio.Event()
+    outbox.direct = direct_write(writer)
+    sender = asyncio.create_task(write_loop_async(writer, outbox))
+    try:
+        username = (await reader.readline()).decode("utf-8").strip()
+        join(writer, username, outbox)
+
+        while True:
+            raw = await reader.readline()
+            if not raw:
+                break
+            handle_message(username, raw, writer)
 
-def start():
+    except (ConnectionError, ValueError):
+        # ValueError — рядок довший за ліміт StreamReader.
+        pass
+
+    finally:
+        leave(writer)
+        disconnect(writer)
+        # Якщо з'єднання впало до join, черги немає в outboxes і leave її не закриє.
+        outbox.close()
+        await sender
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+def start(host=HOST, port=PORT):
     server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    server.bind((HOST, PORT))
+    server.bind((host, port))
     server.listen()
 
-    print(f"[SERVER] Запущено на {HOST}:{PORT}")
+    print(f"[SERVER] Запущено на {host}:{port}")
+
+    if settings["tick"]:
+        threading.Thread(target=tick_loop, args=(settings["tick"],), daemon=True).start()
 
     while True:
         conn, addr = server.accept()
         threading.Thread(target=handle_client, args=(conn,), daemon=True).start()
 
+async def start_async(host=HOST, port=PORT):
+    # Один потік і цикл подій замість потоку на кожне з'єднання.
+    server = await asyncio.start_server(handle_client_async, host, port, backlog=BACKLOG)
+
+    print(f"[SERVER] Запущено на {host}:{port} (asyncio)")
+
+    if settings["tick"]:
+        # Тримаємо посилання, інакше задачу може зібрати GC.
+        ticker = asyncio.create_task(tick_loop_async(settings["tick"]))
+
+    async with server:
+        await server.serve_forever()
+
 if __name__ == "__main__":
-    start()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Сервер позицій і чату")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="режим asyncio")
+    parser.add_argument("--policy", choices=POLICIES, default=settings["policy"],
+                        help="що робити з повільним клієнтом, коли його черга повна")
+    parser.add_argument("--queue-limit", type=int, default=settings["limit"])
+    parser.add_argument("--tick", type=float, default=0,
+                        help="розсилати позиції пакетами N разів на секунду (0 — одразу)")
+    parser.add_argument("--radius", type=float, default=0,
+                        help="надсилати позиції лише гравцям у цьому радіусі (0 — усім)")
+    parser.add_argument("--metrics", type=float, default=0, help="друкувати метрики черг кожні N секунд")
+    args = parser.parse_args()
+    configure(limit=args.queue_limit, policy=args.policy, tick=args.tick, radius=args.radius)
+    if args.metrics:
+        threading.Thread(target=report_metrics, args=(args.metrics,), daemon=True).start()
+
+    if args.use_async:
+        asyncio.run(start_async())
+    else:
+        start()
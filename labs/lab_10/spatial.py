@@ -0,0 +1,78 @@
+import math
+import threading
+
+
+class SpatialGrid:
+    # Рівномірна сітка над позиціями гравців: клітинка (cx, cy) -> {ім'я: (x, y)}.
+    # move оновлює її інкрементно (між клітинками переносить лише при зміні
+    # клітинки), near перебирає тільки клітинки, що перетинають коло запиту,
+    # тож вартість залежить від щільності поруч, а не від кількості гравців.
+    # Замок — бо в потоковому режимі сервера сітку змінюють різні потоки.
+
+    def __init__(self, cell):
+        if cell <= 0:
+            raise ValueError("Розмір клітинки має бути додатним")
+        self.cell = cell
+        self.cells = {}
+        self.where = {}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.where)
+
+    def __contains__(self, user):
+        return user in self.where
+
+    def _key(self, x, y):
+        return math.floor(x / self.cell), math.floor(y / self.cell)
+
+    def move(self, user, x, y):
+        key = self._key(x, y)
+        with self.lock:
+            old = self.where.get(user)
+            if old != key:
+                if old is not None:
+                    self._leave(user, old)
+                self.where[user] = key
+            members = self.cells.get(key)
+            if members is None:
+                members = self.cells[key] = {}
+            members[user] = (x, y)
+
+    def position(self, user):
+        with self.lock:
+            key = self.where.get(user)
+            return None if key is None else self.cells[key][user]
+
+    def remove(self, user):
+        with self.lock:
+            key = self.where.pop(user, None)
+            if key is not None:
+                self._leave(user, key)
+
+    def _leave(self, user, key):
+        members = self.cells[key]
+        del members[user]
+        if not members:
+            del self.cells[key]
+
+    def near(self, x, y, radius):
+        # Імена всіх у колі радіуса radius (межа включно).
+        r2 = radius * radius
+        span = math.ceil(radius / self.cell)
+        cx, cy = self._key(x, y)
+        found = []
+        with self.lock:
+            if (2 * span + 1) ** 2 <= len(self.cells):
+                cells = (self.cells.get((i, j)) for i in range(cx - span, cx + span + 1)
+                         for j in range(cy - span, cy + span + 1))
+            else:
+                # Коло ширше за заселену частину світу — дешевше пройти всі клітинки.
+                cells = (m for (i, j), m in self.cells.items()
+                         if abs(i - cx) <= span and abs(j - cy) <= span)
+            for members in cells:
+                if members:
+                    for user, (ux, uy) in members.items():
+                        if (ux - x) ** 2 + (uy - y) ** 2 <= r2:
+                            found.append(user)
+        return found
@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+from outbox import Outbox
+
+
+def test_drop_oldest_keeps_newest():
+    box = Outbox(limit=3, policy="drop_oldest")
+    for i in range(5):
+        assert box.put(b"%d" % i)
+    assert box.take() == [b"2", b"3", b"4"]
+    assert box.dropped == 2 and box.max_depth == 3 and len(box) == 0
+
+
+def test_coalesce_replaces_pending_position():
+    box = Outbox(limit=3, policy="coalesce")
+    box.put(b"a1", key="a")
+    box.put(b"chat")
+    box.put(b"a2", key="a")
+    box.put(b"b1", key="b")
+    assert box.take() == [b"a2", b"chat", b"b1"]
+    assert box.coalesced == 1 and box.dropped == 0
+    #після take позиція знову потрапляє в кінець черги
+    box.put(b"a3", key="a")
+    assert box.take() == [b"a3"]
+
+
+def test_coalesce_drops_oldest_when_full():
+    box = Outbox(limit=2, policy="coalesce")
+    box.put(b"a1", key="a")
+    box.put(b"b1", key="b")
+    box.put(b"c1", key="c")
+    box.put(b"a2", key="a")
+    assert box.take() == [b"c1", b"a2"]
+    assert box.dropped == 2
+
+
+def test_disconnect_closes_on_overflow():
+    box = Outbox(limit=2, policy="disconnect")
+    assert box.put(b"1") and box.put(b"2")
+    assert not box.put(b"3")
+    assert box.closed and box.overflowed
+    assert not box.put(b"4")
+
+
+def test_wait_wakes_writer_and_stops_on_close():
+    box = Outbox(limit=10)
+    batches = []
+
+    def writer():
+        while True:
+            batch = box.wait()
+            if not batch:
+                break
+            batches.append(batch)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    box.put(b"x")
+    box.close()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert batches == [[b"x"]]
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        Outbox(policy="ignore")
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import socket
+import struct
+
+import pytest
+
+import server
+from outbox import Outbox
+from spatial import SpatialGrid
+
+
+@pytest.fixture
+def boxes(monkeypatch):
+    boxes = {"a": Outbox(), "b": Outbox()}
+    monkeypatch.setattr(server, "outboxes", boxes)
+    monkeypatch.setattr(server, "by_user", {"a": "a", "b": "b", "c": "c"})
+    monkeypatch.setattr(server, "positions", {})
+    monkeypatch.setattr(server, "dirty", set())
+    monkeypatch.setattr(server, "grid", None)
+    monkeypatch.setattr(server, "visible", {})
+    return boxes
+
+
+@pytest.fixture
+def radius(boxes, monkeypatch):
+    boxes["c"] = Outbox()
+    monkeypatch.setitem(server.settings, "radius", 10)
+    monkeypatch.setattr(server, "grid", SpatialGrid(10))
+    return boxes
+
+
+def move(user, x, y):
+    server.handle_message(user, json.dumps({"type": "position", "user": user, "x": x, "y": y}).encode(), user)
+
+
+def test_position_is_broadcast_immediately_without_ticks(boxes, monkeypatch):
+    monkeypatch.setitem(server.settings, "tick", 0)
+    move("a", 1, 2)
+    assert boxes["a"].take() == []
+    assert [json.loads(m) for m in boxes["b"].take()] == [{"type": "position", "user": "a", "x": 1, "y": 2}]
+
+
+def test_tick_sends_one_frame_of_latest_positions(boxes, monkeypatch):
+    monkeypatch.setitem(server.settings, "tick", 20)
+    move("a", 1, 2)
+    move("a", 3, 4)
+    move("b", 5, 6)
+    assert len(boxes["b"]) == 0
+    server.flush_positions()
+    frames = [json.loads(m) for m in boxes["b"].take()]
+    assert len(frames) == 1
+    assert frames[0]["users"] == {"a": [3, 4], "b": [5, 6]}
+    #без змін наступний тік нічого не шле
+    server.flush_positions()
+    assert len(boxes["a"]) == 1 and len(boxes["b"]) == 0
+
+
+def test_tick_skips_users_who_left(boxes, monkeypatch):
+    monkeypatch.setitem(server.settings, "tick", 20)
+    move("a", 1, 2)
+    server.positions.pop("a")
+    server.flush_positions()
+    assert len(boxes["b"]) == 0
+
+
+def test_radius_limits_immediate_positions(radius, monkeypatch):
+    monkeypatch.setitem(server.settings, "tick", 0)
+    move("b", 5, 0)
+    move("c", 50, 0)
+    for box in radius.values():
+        box.take()
+    move("a", 0, 0)
+    assert len(radius["b"].take()) == 1
+    assert radius["c"].take() == []
+    #рядок замість числа ігнорується
+    move("a", "далеко", 0)
+    assert radius["b"].take() == []
+
+
+def test_radius_builds_frame_per_neighbour(radius, monkeypatch):
+    monkeypatch.setitem(server.settings, "tick", 20)
+    move("a", 0, 0)
+    move("b", 5, 0)
+    move("c", 12, 0)
+    server.flush_positions()
+    users = {name: json.loads(box.take()[0])["users"] for name, box in radius.items()}
+    assert users == {"a": {"b": [5, 0]}, "b": {"a": [0, 0], "c": [12, 0]}, "c": {"b": [5, 0]}}
+
+
+def frames(box):
+    return [json.loads(m) for m in box.take()]
+
+
+def test_tick_reports_stationary_neighbours_and_departures(radius, monkeypatch):
+    monkeypatch.setitem(server.settings, "tick", 20)
+    move("a", 0, 0)
+    server.flush_positions()
+    move("b", 5, 0)
+    server.flush_positions()
+    assert frames(radius["b"])[0]["users"] == {"a": [0, 0]}
+    assert frames(radius["a"])[0]["users"] == {"b": [5, 0]}
+    move("b", 200, 0)
+    server.flush_positions()
+    assert [(f["users"], f["gone"]) for f in frames(radius["a"])] == [({}, ["b"])]
+    assert [(f["users"], f["gone"]) for f in frames(radius["b"])] == [({}, ["a"])]
+    #повернення знову показує обох
+    move("b", 3, 0)
+    server.flush_positions()
+    assert frames(radius["b"])[0]["users"] == {"a": [0, 0]}
+
+
+def test_immediate_mode_tracks_visible_set(radius, monkeypatch):
+    monkeypatch.setitem(server.settings, "tick", 0)
+    move("a", 0, 0)
+    move("b", 5, 0)
+    assert frames(radius["b"]) == [{"type": "positions", "users": {"a": [0, 0]}}]
+    assert [f["type"] for f in frames(radius["a"])] == ["position"]
+    move("b", 200, 0)
+    assert frames(radius["a"]) == [{"type": "positions", "users": {}, "gone": ["b"]}]
+    assert frames(radius["b"]) == [{"type": "positions", "users": {}, "gone": ["a"]}]
+
+
+def test_reentry_is_not_hidden_by_queued_gone(radius, monkeypatch):
+    monkeypatch.setitem(server.settings, "tick", 0)
+    move("b", 0, 0)
+    move("a", 5, 0)
+    move("a", 50, 0)
+    move("a", 6, 0)
+    #останнє про a в черзі b — позиція в радіусі, а не gone
+    last = [f for f in frames(radius["b"]) if f.get("user") == "a" or "a" in f.get("gone", ())][-1]
+    assert last == {"type": "position", "user": "a", "x": 6, "y": 0}
+    assert [f for f in frames(radius["a"])] == [{"type": "positions", "users": {"b": [0, 0]}}]
+
+
+def test_leaving_player_is_removed_from_neighbours(radius, monkeypatch):
+    monkeypatch.setitem(server.settings, "tick", 0)
+    monkeypatch.setattr(server, "clients", {"a": "a", "b": "b", "c": "c"})
+    move("a", 0, 0)
+    move("b", 5, 0)
+    radius["a"].take()
+    server.leave("b")
+    assert [f.get("gone") for f in frames(radius["a"])] == [["b"], None]
+    assert server.visible == {"a": set()}
+
+
+def test_async_reset_before_name_finishes_handler(boxes):
+    async def scenario():
+        srv = await asyncio.start_server(server.handle_client_async, "127.0.0.1", 0)
+        sock = socket.create_connection(srv.sockets[0].getsockname())
+        #SO_LINGER=0 — закриття з RST ще до рядка з ім'ям
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        await asyncio.sleep(0.05)
+        sock.close()
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if len(asyncio.all_tasks()) == 1:
+                break
+        srv.close()
+        return len(asyncio.all_tasks())
+
+    assert asyncio.run(scenario()) == 1
+
+
+class LeavingPositions(dict):
+    # Позиція зникає одразу після перевірки — як leave() з іншого потоку.
+    def __contains__(self, user):
+        found = dict.__contains__(self, user)
+        self.pop(user, None)
+        return found
+
+
+def test_tick_survives_player_leaving_mid_flush(radius, monkeypatch, capsys):
+    monkeypatch.setitem(server.settings, "tick", 20)
+    move("a", 0, 0)
+    server.flush_positions()
+    monkeypatch.setattr(server, "positions", LeavingPositions(server.positions))
+    move("b", 5, 0)
+    server.flush_positions()
+    assert [f["tick"] for f in frames(radius["b"])] == [server.totals["ticks"]]
+
+    def broken():
+        raise RuntimeError("тік")
+    monkeypatch.setattr(server, "flush_positions", broken)
+    server.safe_flush()
+    assert "RuntimeError" in capsys.readouterr().err
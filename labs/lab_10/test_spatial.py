@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from spatial import SpatialGrid
+
+
+def brute(points, x, y, radius):
+    return sorted(u for u, (ux, uy) in points.items() if (ux - x) ** 2 + (uy - y) ** 2 <= radius ** 2)
+
+
+@pytest.mark.parametrize("radius", [3, 10, 250])
+def test_near_matches_brute_force(radius):
+    rnd = random.Random(radius)
+    grid, points = SpatialGrid(10), {}
+    for step in range(3000):
+        user = f"u{rnd.randrange(300)}"
+        if rnd.random() < 0.1:
+            grid.remove(user)
+            points.pop(user, None)
+        else:
+            points[user] = (rnd.uniform(-100, 100), rnd.uniform(-100, 100))
+            grid.move(user, *points[user])
+        if step % 100 == 0:
+            x, y = rnd.uniform(-120, 120), rnd.uniform(-120, 120)
+            assert sorted(grid.near(x, y, radius)) == brute(points, x, y, radius)
+    assert len(grid) == len(points)
+    assert sum(len(m) for m in grid.cells.values()) == len(points)
+
+
+def test_move_and_remove_clean_up_cells():
+    grid = SpatialGrid(10)
+    grid.move("a", 1, 1)
+    grid.move("a", 2, 2)
+    assert list(grid.cells) == [(0, 0)]
+    grid.move("a", -1, 25)
+    assert list(grid.cells) == [(-1, 2)] and grid.position("a") == (-1, 25)
+    grid.remove("a")
+    assert not grid.cells and "a" not in grid and grid.position("a") is None
+
+
+def test_cell_must_be_positive():
+    with pytest.raises(ValueError):
+        SpatialGrid(0)
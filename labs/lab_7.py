@@ -1,18 +1,112 @@
 import csv
 import os
+import queue
+import threading
+import time
 from datetime import datetime
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
-COLUMNS = ("id", "name", "category", "quantity", "price", "location", "created_at")
+from search_index import SearchIndex
+from table_model import COLUMNS, ColumnTable
+from virtual_tree import VirtualTree
+
+SEARCH_DELAY_MS = 150
+CHUNK_ROWS = 5000
+POLL_MS = 50
+POLL_BUDGET = 0.03
+
+
+class LoadCancelled(Exception):
+    pass
+
+
+def search_rows(table, index, q):
+    # Рядки для дерева: уся таблиця або знайдені, у поточному порядку показу.
+    if not q:
+        return table.view()
+    return table.view(table.display_indices(index.search(q)))
+
+
+def read_csv_chunks(path, out, cancel, chunk_rows=CHUNK_ROWS):
+    # Фоновий потік: читає CSV і віддає рядки (кортежі в порядку COLUMNS)
+    # пачками через обмежену чергу повідомленнями (kind, payload, progress).
+    # Частку прочитаного рахуємо за байтами, тому файл читаємо як двійковий.
+    def send(kind, payload, progress):
+        while True:
+            if cancel.is_set():
+                raise LoadCancelled()
+            try:
+                out.put((kind, payload, progress), timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    try:
+        size = os.path.getsize(path) or 1
+        done = 0
+        with open(path, "rb") as f:
+            def lines():
+                nonlocal done
+                for raw in f:
+                    done += len(raw)
+                    yield raw.decode("utf-8")
+
+            r = csv.reader(lines())
+            if tuple(next(r, ())) != COLUMNS:
+                raise ValueError("Невірні заголовки CSV")
+            batch = []
+            for row in r:
+                if not row:
+                    continue
+                if len(row) != len(COLUMNS):
+                    raise ValueError(f"Рядок {r.line_num}: очікується {len(COLUMNS)} полів")
+                item_id, name, category, quantity, price, location, created_at = row
+                batch.append((item_id, name, category, int(quantity), float(price), location, created_at))
+                if len(batch) >= chunk_rows:
+                    send("rows", batch, done / size)
+                    batch = []
+            send("rows", batch, 1.0)
+            send("done", None, 1.0)
+    except LoadCancelled:
+        pass
+    except Exception as e:
+        try:
+            send("error", str(e), None)
+        except LoadCancelled:
+            pass
+
+
+def write_csv_atomic(path, rows):
+    # Пишемо в тимчасовий файл поруч і замінюємо ним цільовий, тож
+    # перерване збереження не псує попередню версію файлу.
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(COLUMNS)
+            w.writerows(rows)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
 
 class App:
     def __init__(self, root):
         self.root = root
         self.root.title("Облік товарів")
-        self.data = []
+        self.table = ColumnTable()
         self.current_file = None
         self.sort_state = {c: False for c in COLUMNS}
+        # Ключ запису в індексі — незмінний table.keys[i], бо поле "id" можна змінити.
+        self.index = SearchIndex()
+        self.shown_query = None
+        self._search_job = None
+        self.loading = None
+        self.saving = None
 
         menubar = tk.Menu(self.root)
         filemenu = tk.Menu(menubar, tearoff=0)
@@ -34,14 +128,21 @@ class App:
         self.search_var = tk.StringVar()
         self.search_entry = ttk.Entry(search_bar, textvariable=self.search_var)
         self.search_entry.pack(side="left", fill="x", expand=True, padx=6)
-        self.search_entry.bind("<KeyRelease>", lambda e: self.refresh_tree())
+        self.search_entry.bind("<KeyRelease>", self.on_search_key)
 
-        self.tree = ttk.Treeview(left, columns=COLUMNS, show="headings", height=14)
+        table = ttk.Frame(left)
+        table.pack(fill="both", expand=True)
+        self.tree = ttk.Treeview(table, columns=COLUMNS, show="headings", height=14)
         for col in COLUMNS:
             self.tree.heading(col, text=col, command=lambda c=col: self.sort_by_column(c))
             self.tree.column(col, width=110 if col!="name" else 160, anchor="w")
-        self.tree.pack(fill="both", expand=True)
-        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        # Shift+клік по заголовку додає стовпець до багатостовпцевого сортування.
+        self.tree.bind("<Shift-Button-1>", self.on_shift_click)
+        self.tree.pack(side="left", fill="both", expand=True)
+        scrollbar = ttk.Scrollbar(table, orient="vertical")
+        scrollbar.pack(side="left", fill="y")
+        # У дереві лише видимі рядки; решта — у self.view.rows.
+        self.view = VirtualTree(self.tree, scrollbar, on_select=self.on_select)
 
         right = ttk.Frame(top)
         right.pack(side="left", fill="y", padx=(6,0))
@@ -60,8 +161,13 @@ class App:
         ttk.Button(btns, text="Видалити", command=self.delete_item).pack(side="left", expand=True, fill="x")
         ttk.Button(btns, text="Очистити форму", command=self.clear_form).pack(side="left", expand=True, fill="x", padx=6)
 
+        status_bar = ttk.Frame(self.root)
+        status_bar.pack(fill="x")
         self.status = tk.StringVar(value="Готово")
-        ttk.Label(self.root, textvariable=self.status, anchor="w", relief="sunken").pack(fill="x")
+        ttk.Label(status_bar, textvariable=self.status, anchor="w", relief="sunken").pack(side="left", fill="x", expand=True)
+        self.progress = ttk.Progressbar(status_bar, mode="determinate", maximum=100, length=160)
+        self.cancel_btn = ttk.Button(status_bar, text="Скасувати", command=self.cancel_load)
+        self.root.bind("<Escape>", lambda e: self.cancel_load())
 
     def set_status(self, msg):
         self.status.set(msg)
@@ -71,8 +177,7 @@ class App:
             e.configure(bg="white")
 
     def generate_id(self):
-        ids = [int(str(x["id"])) for x in self.data if str(x["id"]).isdigit()]
-        return str(max(ids) + 1 if ids else 1)
+        return str(self.table.max_id() + 1)
 
     def validate(self, for_update=False, selected_id=None):
         self.clear_highlights()
@@ -101,11 +206,8 @@ class App:
         if not v["location"]:
             self.entries["location"].configure(bg="#ffdddd"); ok = False
 
-        for x in self.data:
-            if str(x["id"]) == v["id"]:
-                if for_update and selected_id == v["id"]:
-                    continue
-                self.entries["id"].configure(bg="#ffdddd"); ok = False
+        if self.table.find(v["id"]) is not None and not (for_update and selected_id == v["id"]):
+            self.entries["id"].configure(bg="#ffdddd"); ok = False
 
         if not ok:
             self.set_status("Перевірте виділені поля")
@@ -117,48 +219,48 @@ class App:
         if not v:
             return
         v["created_at"] = datetime.now().isoformat(timespec="seconds")
-        self.data.append(v)
+        self.append_rows([tuple(v[c] for c in COLUMNS)])
         self.refresh_tree()
         self.set_status("Додано")
 
     def on_select(self, _):
         sel = self.get_selected()
-        if not sel:
+        if sel is None:
             return
+        row = self.table.row(sel)
         for k in self.entries:
             self.entries[k].delete(0, tk.END)
-            self.entries[k].insert(0, sel[k])
+            self.entries[k].insert(0, row[k])
 
     def get_selected(self):
-        sel = self.tree.selection()
-        if not sel:
+        # Повертає позицію вибраного рядка в self.table.
+        values = self.view.selected_values()
+        if not values:
             return None
-        rid = self.tree.item(sel[0], "values")[0]
-        for x in self.data:
-            if str(x["id"]) == str(rid):
-                return x
-        return None
+        return self.table.find(values[0])
 
     def update_item(self):
         sel = self.get_selected()
-        if not sel:
+        if sel is None:
             self.set_status("Виберіть запис")
             return
-        v = self.validate(for_update=True, selected_id=str(sel["id"]))
+        v = self.validate(for_update=True, selected_id=self.table.columns["id"][sel])
         if not v:
             return
-        sel.update(v)
+        self.table.update(sel, v)
+        self.index.update(self.table.keys[sel], v["name"], v["category"])
         self.refresh_tree()
         self.set_status("Оновлено")
 
     def delete_item(self):
         sel = self.get_selected()
-        if not sel:
+        if sel is None:
             self.set_status("Виберіть запис")
             return
         if not messagebox.askyesno("Підтвердження", "Видалити вибраний запис?"):
             return
-        self.data = [x for x in self.data if str(x["id"]) != str(sel["id"])]
+        self.index.remove(self.table.keys[sel])
+        self.table.delete(sel)
         self.refresh_tree()
         self.clear_form()
         self.set_status("Видалено")
@@ -169,45 +271,121 @@ class App:
         self.clear_highlights()
         self.set_status("Форма очищена")
 
+    def on_search_key(self, _):
+        # Швидкий набір дає один пошук: кожна клавіша переносить запуск.
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(SEARCH_DELAY_MS, self.run_search)
+
+    def run_search(self):
+        self._search_job = None
+        if self.search_var.get().strip().lower() != self.shown_query:
+            self.refresh_tree()
+
     def refresh_tree(self):
         q = self.search_var.get().strip().lower()
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        for x in self.data:
-            if q and q not in x["name"].lower() and q not in x["category"].lower():
-                continue
-            self.tree.insert("", "end", values=[x[c] for c in COLUMNS])
-
-    def sort_by_column(self, col):
+        self.shown_query = q
+        self.view.set_rows(search_rows(self.table, self.index, q))
+
+    def append_rows(self, rows):
+        start = self.table.extend(rows)
+        keys = self.table.keys
+        for i, (_, name, category, *_) in enumerate(rows, start):
+            self.index.add(keys[i], name, category)
+
+    def sort_by_column(self, col, add=False):
         self.sort_state[col] = not self.sort_state[col]
-        reverse = self.sort_state[col]
-        try:
-            self.data.sort(key=lambda x: float(x[col]), reverse=reverse)
-        except:
-            self.data.sort(key=lambda x: str(x[col]).lower(), reverse=reverse)
+        spec = list(self.table.sort_spec) if add else []
+        cols = [c for c, _ in spec]
+        if col in cols:
+            # Стовпець уже в сортуванні — змінюємо напрям на його місці.
+            spec[cols.index(col)] = (col, self.sort_state[col])
+        else:
+            spec.append((col, self.sort_state[col]))
+        self.table.sort(spec)
+        self.update_headings()
         self.refresh_tree()
 
+    def on_shift_click(self, event):
+        if self.tree.identify_region(event.x, event.y) != "heading":
+            return None
+        col = self.tree.identify_column(event.x)
+        self.sort_by_column(COLUMNS[int(col[1:]) - 1], add=True)
+        return "break"
+
+    def update_headings(self):
+        spec = self.table.sort_spec
+        marks = {c: ("▼" if r else "▲") + (str(i) if len(spec) > 1 else "") for i, (c, r) in enumerate(spec, 1)}
+        for col in COLUMNS:
+            self.tree.heading(col, text=f"{col} {marks[col]}" if col in marks else col)
+
     def open_csv(self):
         path = filedialog.askopenfilename(filetypes=[("CSV files","*.csv")])
         if not path:
             return
-        try:
-            with open(path, newline="", encoding="utf-8") as f:
-                r = csv.DictReader(f)
-                if tuple(r.fieldnames or []) != COLUMNS:
-                    raise ValueError("Невірні заголовки CSV")
-                rows = []
-                for row in r:
-                    row["quantity"] = int(row["quantity"])
-                    row["price"] = float(row["price"])
-                    rows.append(row)
-            self.data = rows
-            self.current_file = path
+        self.cancel_load()
+        # Рядки показуються одразу пачками; файл стає поточним лише після
+        # повного завантаження, щоб "Зберегти" не перезаписало його частиною.
+        self.table.clear()
+        self.index.clear()
+        self.current_file = None
+        self.update_headings()
+        self.refresh_tree()
+        cancel = threading.Event()
+        results = queue.Queue(maxsize=4)
+        self.loading = cancel
+        threading.Thread(target=read_csv_chunks, args=(path, results, cancel), daemon=True).start()
+        self.progress.configure(value=0)
+        self.progress.pack(side="left", padx=4)
+        self.cancel_btn.pack(side="left")
+        self.set_status(f"Завантаження {os.path.basename(path)}…")
+        self.root.after(POLL_MS, self.poll_load, path, results, cancel)
+
+    def poll_load(self, path, results, cancel):
+        if cancel is not self.loading:
+            return
+        # Обробляємо пачки, доки не вичерпано часовий бюджет кадру.
+        start = time.perf_counter()
+        added = False
+        finished = None
+        while time.perf_counter() - start < POLL_BUDGET:
+            try:
+                kind, payload, progress = results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "rows":
+                self.append_rows(payload)
+                self.progress.configure(value=progress * 100)
+                added = True
+            else:
+                finished = (kind, payload)
+                break
+        if added:
             self.refresh_tree()
-            self.set_status(f"Завантажено {os.path.basename(path)}")
-        except Exception as e:
-            messagebox.showerror("Помилка відкриття", str(e))
-            self.set_status("Помилка відкриття")
+        name = os.path.basename(path)
+        if finished is None:
+            self.set_status(f"Завантаження {name}… {len(self.table)} рядків")
+            self.root.after(POLL_MS, self.poll_load, path, results, cancel)
+            return
+        self.finish_load()
+        if finished[0] == "done":
+            self.current_file = path
+            self.set_status(f"Завантажено {name}")
+        else:
+            messagebox.showerror("Помилка відкриття", finished[1])
+            self.set_status(f"Помилка відкриття, завантажено {len(self.table)} рядків")
+
+    def finish_load(self):
+        self.loading = None
+        self.progress.pack_forget()
+        self.cancel_btn.pack_forget()
+
+    def cancel_load(self):
+        if self.loading is None:
+            return
+        self.loading.set()
+        self.finish_load()
+        self.set_status(f"Завантаження скасовано, завантажено {len(self.table)} рядків")
 
     def save_csv(self):
         if not self.current_file:
@@ -222,14 +400,37 @@ class App:
         self.write_csv(path)
 
     def write_csv(self, path):
+        if self.saving is not None:
+            self.set_status("Збереження вже триває")
+            return
+        # Потік пише знімок стовпців, тож редагування під час запису на
+        # файл не впливає. Потік не daemon — вихід дочекається запису.
+        snapshot = self.table.copy()
+        results = queue.Queue()
+
+        def work():
+            try:
+                write_csv_atomic(path, snapshot.iter_rows())
+                results.put(None)
+            except Exception as e:
+                results.put(str(e))
+
+        self.saving = threading.Thread(target=work)
+        self.saving.start()
+        self.set_status(f"Збереження {os.path.basename(path)}…")
+        self.root.after(POLL_MS, self.poll_save, path, results)
+
+    def poll_save(self, path, results):
         try:
-            with open(path, "w", newline="", encoding="utf-8") as f:
-                w = csv.DictWriter(f, fieldnames=COLUMNS)
-                w.writeheader()
-                w.writerows(self.data)
+            error = results.get_nowait()
+        except queue.Empty:
+            self.root.after(POLL_MS, self.poll_save, path, results)
+            return
+        self.saving = None
+        if error is None:
             self.set_status(f"Збережено {os.path.basename(path)}")
-        except Exception as e:
-            messagebox.showerror("Помилка збереження", str(e))
+        else:
+            messagebox.showerror("Помилка збереження", error)
             self.set_status("Помилка збереження")
 
 if __name__ == "__main__":
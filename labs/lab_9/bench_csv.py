@@ -0,0 +1,59 @@
+import csv
+import os
+import sys
+import tempfile
+import time
+
+from bench_item import make_args
+from inventory import CSV_FIELDS, Inventory, Item, iter_csv
+
+
+def legacy_save(items, filename):
+    with open(filename, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        for item in items:
+            writer.writerow([
+                item.name, item.category, item.quantity, item.value,
+                item.condition, item.location, item.added_at
+            ])
+
+
+def legacy_load(filename):
+    items = []
+    with open(filename, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            items.append(Item(
+                name=row["name"], category=row["category"], quantity=int(row["quantity"]),
+                value=float(row["value"]), condition=row["condition"],
+                location=row["location"], added_at=row["added_at"]
+            ))
+    return items
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    fn()
+    print(f"{label:>28}: {time.perf_counter() - start:6.2f} s")
+
+
+def main():
+    # За замовчуванням 10M рядків (~600 MB); для швидкої перевірки передайте менше.
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    inv = Inventory(items=[Item(*a, added_at="2025-01-01 10:00:00") for a in make_args(n)])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "inventory.csv")
+        print(f"rows: {n}, cpu: {os.cpu_count()}")
+        timed("save, row by row", lambda: legacy_save(inv.items, path))
+        timed("save_to_csv (buffered)", lambda: inv.save_to_csv(path))
+        print(f"{'file size':>28}: {os.path.getsize(path) / 2**20:6.0f} MB")
+        del inv
+
+        timed("load, DictReader", lambda: legacy_load(path))
+        timed("iter_csv, streaming count", lambda: sum(1 for _ in iter_csv(path)))
+        timed("load_from_csv", lambda: Inventory().load_from_csv(path))
+        timed("load_from_csv(parallel)", lambda: Inventory().load_from_csv(path, parallel=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from inventory import Item
+
+
+@dataclass(order=True)
+class LegacyItem:
+    # Попередня версія Item — для порівняння.
+    sort_index: tuple = field(init=False, repr=False)
+
+    name: str
+    category: str
+    quantity: int
+    value: float
+    condition: str
+    location: str
+    added_at: str = field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+    def __post_init__(self):
+        self.sort_index = (self.category, self.value)
+
+
+CATEGORIES = ["інструменти", "електроніка", "меблі", "посуд"]
+CONDITIONS = ["новий", "вживаний"]
+LOCATIONS = ["гараж", "кімната", "комора"]
+
+
+def make_args(n):
+    rnd = random.Random(1)
+    return [(f"Предмет {k}", rnd.choice(CATEGORIES), rnd.randint(1, 10), float(rnd.randint(1, 5000)),
+             rnd.choice(CONDITIONS), rnd.choice(LOCATIONS)) for k in range(n)]
+
+
+def build(cls, args):
+    return [cls(*a) for a in args]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    args = make_args(n)
+    print(f"items: {n}")
+    print(f"{'':>12} {'construct, s':>13} {'memory, MB':>11} {'B/item':>7} {'sort, s':>8}")
+    for label, cls, key in (("dataclass", LegacyItem, None), ("slots", Item, Item.sort_key)):
+        start = time.perf_counter()
+        items = build(cls, args)
+        construct = time.perf_counter() - start
+        del items
+
+        tracemalloc.start()
+        items = build(cls, args)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        items.sort(key=key)
+        sort = time.perf_counter() - start
+        print(f"{label:>12} {construct:>13.2f} {size / 2**20:>11.1f} {size / n:>7.0f} {sort:>8.2f}")
+        del items
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+from bench_item import make_args
+from inventory import Inventory, Item
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:>34}: {(time.perf_counter() - start) * 1000:9.1f} ms")
+    return result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    inv = Inventory(items=[Item(*a, added_at="2025-01-01 10:00:00") for a in make_args(n)])
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "inventory.csv")
+        snap_path = os.path.join(tmp, "inventory.snap")
+        print(f"items: {n}")
+        timed("save_to_csv", lambda: inv.save_to_csv(csv_path))
+        timed("save_snapshot", lambda: inv.save_snapshot(snap_path))
+        print(f"{'size csv / snapshot':>34}: {os.path.getsize(csv_path) / 2**20:.0f} MB / "
+              f"{os.path.getsize(snap_path) / 2**20:.0f} MB")
+        del inv
+
+        timed("load_from_csv (cold start)", lambda: Inventory().load_from_csv(csv_path))
+        opened = Inventory()
+        timed("open_snapshot (cold start)", lambda: opened.open_snapshot(snap_path))
+        rnd = random.Random(1)
+        picks = [rnd.randrange(n) for _ in range(1000)]
+        timed("snapshot: 1000 random items", lambda: [opened.items[i] for i in picks])
+        timed("snapshot: total_inventory_value", opened.total_inventory_value)
+        print(f"{'decoded items':>34}: {opened.items.decoded()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import sys
+import time
+
+from bench_item import make_args
+from inventory import Inventory, Item
+
+
+def timed(label, fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:>42}: {best * 1000:9.2f} ms")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    inv = Inventory(items=[Item(*a, added_at="2025-01-01 10:00:00") for a in make_args(n)])
+    print(f"items: {n}")
+    timed("побудова впорядкованого індексу (раз)", lambda: (setattr(inv.index, "by_order", None), inv.index.ordered()), 1)
+    timed("sorted(items, key=sort_key)", lambda: sorted(inv.items, key=Item.sort_key), 1)
+    timed("iter_sorted() повністю", lambda: list(inv.iter_sorted()), 1)
+    timed("топ-20 категорії: повне сортування", lambda: sorted(
+        [i for i in inv.items if i.category == "меблі"], key=lambda i: i.value, reverse=True)[:20], 1)
+    timed("top_k(20, category=...)", lambda: inv.top_k(20, category="меблі"))
+    timed("top_k(20)", lambda: inv.top_k(20))
+    timed("перші 20 з iter_sorted(category=...)", lambda: [i for _, i in zip(range(20), inv.iter_sorted("меблі"))])
+    timed("top_k(20, key=total_value)", lambda: inv.top_k(20, key=Item.total_value), 1)
+
+
+if __name__ == "__main__":
+    main()
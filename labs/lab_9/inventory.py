@@ -1,23 +1,73 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import List, Optional
+from functools import total_ordering
+from typing import Iterator, List, Optional, Tuple, Union
 import csv
+import io
+import itertools
+import os
+import time
 
+from inventory_index import InventoryIndex
+from inventory_snapshot import SnapshotItems, write_snapshot
+from inventory_stats import InventoryStats
 
-@dataclass(order=True)
-class Item:
-    sort_index: tuple = field(init=False, repr=False)
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+CSV_FIELDS = ["name", "category", "quantity", "value", "condition", "location", "added_at"]
+WRITE_BUFFER = 1 << 20
+WRITE_BATCH = 10000
+PARALLEL_CHUNK = 16 << 20
 
-    name: str
-    category: str
-    quantity: int
-    value: float
-    condition: str
-    location: str
-    added_at: str = field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 
-    def __post_init__(self):
-        self.sort_index = (self.category, self.value)
+@total_ordering
+class Item:
+    # Компактний предмет: __slots__ замість __dict__, ключ сортування
+    # (category, value) обчислюється при порівнянні, а не зберігається.
+    # Якщо added_at не передано, зберігається time.time(), а рядок
+    # форматується при першому зверненні.
+    __slots__ = ("name", "category", "quantity", "value", "condition", "location", "_added_at")
+
+    def __init__(self, name: str, category: str, quantity: int, value: float,
+                 condition: str, location: str, added_at: Optional[str] = None):
+        self.name = name
+        self.category = category
+        self.quantity = quantity
+        self.value = value
+        self.condition = condition
+        self.location = location
+        self._added_at: Union[str, float] = time.time() if added_at is None else added_at
+
+    @property
+    def added_at(self) -> str:
+        if not isinstance(self._added_at, str):
+            self._added_at = time.strftime(TIME_FORMAT, time.localtime(self._added_at))
+        return self._added_at
+
+    @added_at.setter
+    def added_at(self, value: str):
+        self._added_at = value
+
+    def sort_key(self) -> tuple:
+        return (self.category, self.value, self.name, self.quantity,
+                self.condition, self.location, self.added_at)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.sort_key() == other.sort_key()
+
+    def __lt__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.sort_key() < other.sort_key()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"Item(name={self.name!r}, category={self.category!r}, quantity={self.quantity!r}, "
+                f"value={self.value!r}, condition={self.condition!r}, location={self.location!r}, "
+                f"added_at={self.added_at!r})")
 
     def total_value(self) -> float:
         return self.quantity * self.value
@@ -26,18 +76,166 @@ class Item:
         return f"[{self.category}] {self.name} ({self.quantity} шт.) — {self.value} грн/шт, стан: {self.condition}"
 
 
+def _row_parser(header: List[str]):
+    # Перетворює рядок CSV (список значень) на кортеж аргументів Item
+    # незалежно від порядку стовпців у файлі.
+    missing = [f for f in CSV_FIELDS if f not in header]
+    if missing:
+        raise ValueError(f"У CSV немає стовпців: {', '.join(missing)}")
+    n, c, q, v, cond, loc, added = (header.index(f) for f in CSV_FIELDS)
+
+    def parse(row: List[str]) -> tuple:
+        return (row[n], row[c], int(row[q]), float(row[v]), row[cond], row[loc], row[added])
+    return parse
+
+
+def iter_csv(filename: str) -> Iterator[Item]:
+    # Потокове читання: предмети віддаються по одному, файл цілком у
+    # пам'яті не тримається.
+    with open(filename, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        parse = _row_parser(next(reader, []))
+        for row in reader:
+            if row:
+                yield Item(*parse(row))
+
+
+def _parse_range(args: Tuple[str, int, int, List[str]]) -> List[tuple]:
+    filename, start, end, header = args
+    with open(filename, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    parse = _row_parser(header)
+    return [parse(row) for row in csv.reader(io.StringIO(text, newline="")) if row]
+
+
+def csv_ranges(filename: str, chunk_size: int = PARALLEL_CHUNK) -> Tuple[List[str], List[Tuple[int, int]]]:
+    # Ділить файл після заголовка на діапазони байтів приблизно по
+    # chunk_size, зсуваючи кожну межу до кінця рядка. Поля з переносами
+    # рядків усередині лапок такий поділ не підтримує.
+    size = os.path.getsize(filename)
+    ranges = []
+    with open(filename, "rb") as f:
+        header_line = f.readline()
+        header = next(csv.reader([header_line.decode("utf-8")]), [])
+        start = f.tell()
+        while start < size:
+            f.seek(min(start + chunk_size, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+
+def iter_csv_parallel(filename: str, workers: Optional[int] = None,
+                      chunk_size: int = PARALLEL_CHUNK) -> Iterator[Item]:
+    # Великий файл розбирається шматками в пулі процесів; процеси повертають
+    # кортежі (їх значно дешевше передавати, ніж об'єкти), а Item
+    # створюються тут у порядку файлу. Одночасно в роботі не більше
+    # 2 * workers шматків, щоб розібрані дані не накопичувались.
+    header, ranges = csv_ranges(filename, chunk_size)
+    _row_parser(header)
+    if len(ranges) < 2:
+        yield from iter_csv(filename)
+        return
+    workers = workers or os.cpu_count() or 1
+    tasks = ((filename, start, end, header) for start, end in ranges)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque(pool.submit(_parse_range, t) for t in itertools.islice(tasks, 2 * workers))
+        while pending:
+            rows = pending.popleft().result()
+            task = next(tasks, None)
+            if task is not None:
+                pending.append(pool.submit(_parse_range, task))
+            for args in rows:
+                yield Item(*args)
+
+
 @dataclass
 class Inventory:
     items: List[Item] = field(default_factory=list)
+    # check_totals=True — після кожної зміни підсумки звіряються з даними (для тестів).
+    check_totals: bool = field(default=False, repr=False, compare=False)
+    # Індекси й підсумки оновлюються методами класу; після зміни items
+    # чи полів предметів напряму — reindex().
+    index: InventoryIndex = field(default_factory=InventoryIndex, init=False, repr=False, compare=False)
+    stats: InventoryStats = field(default_factory=InventoryStats, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.reindex()
+
+    def reindex(self):
+        self.index.rebuild(self.items)
+        self.stats.rebuild(self.items)
+
+    def _ensure_index(self):
+        if len(self.index) != len(self.items):
+            self.index.rebuild(self.items)
+        self._ensure_stats()
+
+    def _ensure_stats(self):
+        if self.stats.count != len(self.items):
+            if isinstance(self.items, SnapshotItems):
+                self.stats.rebuild_columns(*(self.items.column(f) for f in ("quantity", "value", "category", "location")))
+            else:
+                self.stats.rebuild(self.items)
+
+    def _writable(self):
+        # Після open_snapshot items — лінивий SnapshotItems; перед зміною
+        # списку перетворюємо його на звичайний list.
+        if not isinstance(self.items, list):
+            self.items = list(self.items)
+
+    def _changed(self):
+        if self.check_totals:
+            self._refresh_order()
+            self.stats.verify(self.items)
+
+    def _refresh_order(self):
+        # Категорії, чий перший предмет зник, шукають новий перший серед своїх.
+        if self.stats.stale:
+            self._ensure_index()
+            index = self.index
+
+            def first_of(cat):
+                keys = index.hashed["category"].get(cat.lower(), ())
+                return min(index.order[k] for k in keys if index.items[k].category == cat)
+
+            self.stats.refresh_order(first_of)
 
     def add_item(self, item: Item):
+        self._writable()
+        self._ensure_index()
         self.items.append(item)
+        self.index.add(item)
+        self.stats.add(item, self.index.order[id(item)])
+        self._changed()
+
+    def update_item(self, item: Item, **changes):
+        unknown = set(changes) - set(CSV_FIELDS)
+        if unknown:
+            raise TypeError(f"Невідомі поля: {', '.join(sorted(unknown))}")
+        self._ensure_index()
+        before = (item.quantity, item.value, item.category, item.location)
+        self.index.update(item, changes)
+        self.stats.update(before, item, self.index.order[id(item)])
+        self._changed()
 
     def remove_item(self, name: str):
-        self.items = [i for i in self.items if i.name.lower() != name.lower()]
+        self._ensure_index()
+        keys = set(self.index.named(name))
+        if not keys:
+            return
+        for key in keys:
+            item = self.index.items[key]
+            self.stats.remove(item, self.index.order[key])
+            self.index.remove(item)
+        self.items = [i for i in self.items if id(i) not in keys]
+        self._changed()
 
     def find_by_category(self, category: str) -> List[Item]:
-        return [i for i in self.items if i.category.lower() == category.lower()]
+        return self.filter_items(category=category)
 
     def filter_items(
         self,
@@ -49,66 +247,77 @@ class Inventory:
         max_value: Optional[float] = None
     ) -> List[Item]:
 
+        self._ensure_index()
+        result = self.index.query(name, category, condition, location, min_value, max_value)
+        if result is not None:
+            return result
+
+        # Лише підрядок назви (або без критеріїв) — індекс не допоможе.
         result = self.items
 
         if name:
-            result = [i for i in result if name.lower() in i.name.lower()]
-
-        if category:
-            result = [i for i in result if i.category.lower() == category.lower()]
-
-        if condition:
-            result = [i for i in result if i.condition.lower() == condition.lower()]
-
-        if location:
-            result = [i for i in result if i.location.lower() == location.lower()]
-
-        if min_value is not None:
-            result = [i for i in result if i.value >= min_value]
-
-        if max_value is not None:
-            result = [i for i in result if i.value <= max_value]
+            needle = name.lower()
+            result = [i for i in result if needle in i.name.lower()]
 
         return result
 
     def sort_items(self):
-        self.items.sort()
+        self._writable()
+        self.items.sort(key=Item.sort_key)
+        self.index.renumber(self.items)
+        # Перерахунок повертає категоріям порядок першої появи в новому списку.
+        self.stats.rebuild(self.items)
+
+    def iter_sorted(self, category: Optional[str] = None) -> Iterator[Item]:
+        self._ensure_index()
+        return self.index.iter_sorted(category)
+
+    def top_k(self, n: int, key=None, category: Optional[str] = None) -> List[Item]:
+        self._ensure_index()
+        return self.index.top_k(n, key, category)
 
     def total_inventory_value(self) -> float:
-        return sum(item.total_value() for item in self.items)
+        self._ensure_stats()
+        return self.stats.total_value
 
     def save_to_csv(self, filename: str):
-        with open(filename, "w", newline="", encoding="utf-8") as f:
+        # Великий буфер файлу і writerows пачками замість рядка за рядком.
+        items = self.items
+        with open(filename, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER) as f:
             writer = csv.writer(f)
-            writer.writerow(["name", "category", "quantity", "value", "condition", "location", "added_at"])
-            for item in self.items:
-                writer.writerow([
-                    item.name, item.category, item.quantity, item.value,
-                    item.condition, item.location, item.added_at
+            writer.writerow(CSV_FIELDS)
+            for start in range(0, len(items), WRITE_BATCH):
+                writer.writerows([
+                    (i.name, i.category, i.quantity, i.value, i.condition, i.location, i.added_at)
+                    for i in items[start:start + WRITE_BATCH]
                 ])
 
-    def load_from_csv(self, filename: str):
-        self.items.clear()
-        with open(filename, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                item = Item(
-                    name=row["name"],
-                    category=row["category"],
-                    quantity=int(row["quantity"]),
-                    value=float(row["value"]),
-                    condition=row["condition"],
-                    location=row["location"],
-                    added_at=row["added_at"]
-                )
-                self.items.append(item)
+    def load_from_csv(self, filename: str, parallel: bool = False, workers: Optional[int] = None):
+        if isinstance(self.items, list):
+            self.items.clear()
+        else:
+            self.items = []
+        source = iter_csv_parallel(filename, workers) if parallel else iter_csv(filename)
+        self.items.extend(source)
+        self.reindex()
+        self._changed()
+
+    def save_snapshot(self, filename: str):
+        write_snapshot(filename, self.items)
+
+    def open_snapshot(self, filename: str):
+        # Миттєве відкриття: предмети створюються при першому зверненні.
+        # Індекси й підсумки будуються ліниво, при першому запиті чи зміні.
+        self.items = SnapshotItems(filename, Item)
+        self.index.clear()
+        self.stats.clear()
 
     def export_summary(self):
-        summary = {}
-        for item in self.items:
-            summary[item.category] = summary.get(item.category, 0) + item.quantity
+        self._ensure_stats()
+        self._refresh_order()
+        summary = self.stats.category_quantity
 
-        return "\n".join(f"{cat}: {qty} шт." for cat, qty in summary.items())
+        return "\n".join(f"{cat}: {summary[cat]} шт." for cat in self.stats.categories())
     
 
 if __name__ == "__main__":
@@ -0,0 +1,238 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from operator import attrgetter, itemgetter
+import bisect
+import heapq
+import itertools
+
+HASHED_FIELDS = ("category", "condition", "location")
+
+
+@dataclass
+class InventoryIndex:
+    # Індекси над предметами інвентаря. Ключ предмета — id(item): словник
+    # items тримає посилання, тож id не перевикористається, поки предмет в
+    # індексі. Текстові поля індексуються в нижньому регістрі, value —
+    # відсортованим списком (value, id) для запитів за діапазоном. Індекс
+    # назв потрібен лише remove_item, а впорядкований індекс (категорія ->
+    # відсортований список (value, id)) — лише впорядкованим читанням, тож
+    # обидва будуються при першому зверненні.
+    items: Dict[int, object] = field(default_factory=dict)
+    by_name: Optional[Dict[str, Set[int]]] = None
+    by_order: Optional[Dict[str, List[Tuple[float, int]]]] = None
+    hashed: Dict[str, Dict[str, Set[int]]] = field(
+        default_factory=lambda: {f: {} for f in HASHED_FIELDS})
+    by_value: List[Tuple[float, int]] = field(default_factory=list)
+    order: Dict[int, int] = field(default_factory=dict)
+    _seq: Iterator[int] = field(default_factory=itertools.count, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def clear(self):
+        self.items.clear()
+        self.by_name = None
+        self.by_order = None
+        for index in self.hashed.values():
+            index.clear()
+        self.by_value.clear()
+        self.order.clear()
+
+    def rebuild(self, items: Iterable):
+        # Масове побудування по полях: спершу групуємо ключі за сирим
+        # значенням (lower() — раз на унікальне значення), value-індекс
+        # сортується один раз.
+        self.clear()
+        items = list(items)
+        keys = list(map(id, items))
+        self.items.update(zip(keys, items))
+        self.order.update(zip(keys, range(len(keys))))
+        self._seq = itertools.count(len(keys))
+        for f, index in self.hashed.items():
+            groups = {}
+            for key, value in zip(keys, map(attrgetter(f), items)):
+                group = groups.get(value)
+                if group is None:
+                    groups[value] = [key]
+                else:
+                    group.append(key)
+            for value, group in groups.items():
+                index.setdefault(value.lower(), set()).update(group)
+        self.by_value.extend(zip(map(attrgetter("value"), items), keys))
+        self.by_value.sort()
+
+    def add(self, item):
+        key = id(item)
+        self.items[key] = item
+        self.order[key] = next(self._seq)
+        if self.by_name is not None:
+            self.by_name.setdefault(item.name.lower(), set()).add(key)
+        for f, index in self.hashed.items():
+            index.setdefault(getattr(item, f).lower(), set()).add(key)
+        entry = (item.value, key)
+        self._insert(self.by_value, entry)
+        if self.by_order is not None:
+            self._insert(self.by_order.setdefault(item.category, []), entry)
+
+    def remove(self, item):
+        key = id(item)
+        if self.items.pop(key, None) is None:
+            return
+        del self.order[key]
+        if self.by_name is not None:
+            self._discard(self.by_name, item.name.lower(), key)
+        for f, index in self.hashed.items():
+            self._discard(index, getattr(item, f).lower(), key)
+        entry = (item.value, key)
+        self._delete(self.by_value, entry)
+        if self.by_order is not None:
+            entries = self.by_order[item.category]
+            self._delete(entries, entry)
+            if not entries:
+                del self.by_order[item.category]
+
+    def update(self, item, changes: dict):
+        # Зміна полів предмета з перебудовою його записів; порядок видачі зберігається.
+        key = id(item)
+        seq = self.order[key]
+        self.remove(item)
+        for f, v in changes.items():
+            setattr(item, f, v)
+        self.add(item)
+        self.order[key] = seq
+
+    def renumber(self, items: Iterable):
+        # Після сортування списку предметів порядок видачі береться з нього.
+        self.order = {id(item): i for i, item in enumerate(items)}
+        self._seq = itertools.count(len(self.order))
+
+    def named(self, name: str) -> Set[int]:
+        if self.by_name is None:
+            self.by_name = {}
+            for key, item in self.items.items():
+                self.by_name.setdefault(item.name.lower(), set()).add(key)
+        return self.by_name.get(name.lower(), set())
+
+    def query(self, name: Optional[str] = None, category: Optional[str] = None,
+              condition: Optional[str] = None, location: Optional[str] = None,
+              min_value: Optional[float] = None, max_value: Optional[float] = None) -> Optional[list]:
+        # Планувальник: рахуємо розмір кожного джерела (множини хеш-індексу
+        # або діапазону value через bisect), беремо найменше, перетинаємо з
+        # рештою множин. Діапазон, якщо він не найменший, і підрядок name
+        # перевіряються на кандидатах. None — критеріїв для індексу немає.
+        sources = []
+        for f, v in (("category", category), ("condition", condition), ("location", location)):
+            if v:
+                ids = self.hashed[f].get(v.lower())
+                if not ids:
+                    return []
+                sources.append((len(ids), ids))
+        ranged = min_value is not None or max_value is not None
+        if ranged:
+            lo = 0 if min_value is None else bisect.bisect_left(self.by_value, (min_value, -1))
+            hi = len(self.by_value) if max_value is None else bisect.bisect_right(self.by_value, (max_value, float("inf")))
+            if lo >= hi:
+                return []
+            sources.append((hi - lo, None))
+        if not sources:
+            return None
+
+        sources.sort(key=lambda s: s[0])
+        if sources[0][1] is None:
+            ids = {key for _, key in self.by_value[lo:hi]}
+            ranged = False
+        else:
+            ids = sources[0][1]
+        others = [s for _, s in sources[1:] if s is not None]
+        if others:
+            ids = ids.intersection(*others)
+
+        items = self.items
+        result = [items[key] for key in ids]
+        if ranged:
+            result = [i for i in result
+                      if (min_value is None or i.value >= min_value)
+                      and (max_value is None or i.value <= max_value)]
+        if name:
+            needle = name.lower()
+            result = [i for i in result if needle in i.name.lower()]
+        order = self.order
+        result.sort(key=lambda i: order[id(i)])
+        return result
+
+    def ordered(self) -> Dict[str, List[Tuple[float, int]]]:
+        if self.by_order is None:
+            groups = {}
+            for key, item in self.items.items():
+                groups.setdefault(item.category, []).append((item.value, key))
+            for entries in groups.values():
+                entries.sort()
+            self.by_order = groups
+        return self.by_order
+
+    def _categories(self, category: Optional[str]) -> List[str]:
+        ordered = self.ordered()
+        if category is None:
+            return sorted(ordered)
+        wanted = category.lower()
+        return sorted(c for c in ordered if c.lower() == wanted)
+
+    def iter_sorted(self, category: Optional[str] = None) -> Iterator:
+        # Прохід упорядкованим індексом у порядку Item.sort_key (як після
+        # sort_items). Лише групи з однаковими category і value
+        # досортовуються повним ключем, рівні ключі — у порядку items.
+        ordered, items, order = self.ordered(), self.items, self.order
+        for cat in self._categories(category):
+            for _, group in itertools.groupby(ordered[cat], key=itemgetter(0)):
+                keys = [key for _, key in group]
+                if len(keys) > 1:
+                    keys.sort(key=lambda k: (items[k].sort_key(), order[k]))
+                for key in keys:
+                    yield items[key]
+
+    def top_k(self, n: int, key=None, category: Optional[str] = None) -> list:
+        # n найбільших за key (за замовчуванням — value) предметів, як у
+        # sorted(..., key=key, reverse=True)[:n]: рівні — у порядку items.
+        # Без key — прохід з кінця впорядкованого індексу зі злиттям
+        # категорій, з key — вибір купою серед кандидатів.
+        if n <= 0:
+            return []
+        items, order = self.items, self.order
+        if key is not None:
+            if category is None:
+                candidates = items.values()
+            else:
+                candidates = [items[k] for k in self.hashed["category"].get(category.lower(), ())]
+            return heapq.nlargest(n, candidates, key=lambda i: (key(i), -order[id(i)]))
+
+        def walk(entries):
+            for value, group in itertools.groupby(reversed(entries), key=itemgetter(0)):
+                for k in sorted((k for _, k in group), key=order.__getitem__):
+                    yield value, -order[k], k
+
+        ordered = self.ordered()
+        merged = heapq.merge(*(walk(ordered[c]) for c in self._categories(category)), reverse=True)
+        return [items[k] for _, _, k in itertools.islice(merged, n)]
+
+    @staticmethod
+    def _insert(entries: List[Tuple[float, int]], entry: Tuple[float, int]):
+        if not entries or entry > entries[-1]:
+            entries.append(entry)
+        else:
+            bisect.insort(entries, entry)
+
+    @staticmethod
+    def _delete(entries: List[Tuple[float, int]], entry: Tuple[float, int]):
+        pos = bisect.bisect_left(entries, entry)
+        if pos < len(entries) and entries[pos] == entry:
+            del entries[pos]
+        else:
+            entries.remove(entry)
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[int]], value: str, key: int):
+        ids = index.get(value)
+        if ids is not None:
+            ids.discard(key)
+            if not ids:
+                del index[value]
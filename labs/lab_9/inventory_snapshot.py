@@ -0,0 +1,154 @@
+from array import array
+from collections.abc import Sequence
+from typing import Callable, Iterable, List
+import mmap
+import os
+import struct
+import sys
+
+# Формат знімка (little-endian), версія 1:
+#   заголовок: magic(8) version(u32) reserved(u32) rows(u64) strings(u64)
+#   quantity: i64[rows], value: f64[rows]
+#   name, category, condition, location, added_at: u32[rows] — номери рядків
+#   таблиця рядків: зміщення u64[strings + 1] і далі UTF-8 байти підряд
+# Кожна секція вирівняна на 8 байтів.
+MAGIC = b"INVSNAP\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQ")
+STRING_FIELDS = ("name", "category", "condition", "location", "added_at")
+NATIVE_LE = sys.byteorder == "little"
+
+
+def _pad(n: int) -> int:
+    return (8 - n % 8) % 8
+
+
+def write_snapshot(path: str, items: Iterable):
+    # Записуємо у тимчасовий файл і замінюємо, щоб відкритий знімок не побився.
+    strings = {}
+    quantity, value = array("q"), array("d")
+    refs = {f: array("I") for f in STRING_FIELDS}
+    for item in items:
+        quantity.append(item.quantity)
+        value.append(item.value)
+        for f in STRING_FIELDS:
+            s = getattr(item, f)
+            ref = strings.get(s)
+            if ref is None:
+                ref = strings[s] = len(strings)
+            refs[f].append(ref)
+
+    offsets, blob = array("Q", [0]), bytearray()
+    for s in strings:
+        blob += s.encode("utf-8")
+        offsets.append(len(blob))
+
+    sections = [quantity, value, *refs.values(), offsets]
+    if not NATIVE_LE:
+        for section in sections:
+            section.byteswap()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, len(quantity), len(strings)))
+            for section in sections:
+                data = section.tobytes()
+                f.write(data + b"\0" * _pad(len(data)))
+            f.write(blob)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class SnapshotItems(Sequence):
+    # Список предметів поверх mmap знімка: стовпці — memoryview без
+    # копіювання, Item створюється при першому зверненні до рядка і
+    # кешується (той самий об'єкт при повторних зверненнях), рядки
+    # декодуються лише для торкнутих предметів.
+
+    def __init__(self, path: str, make_item: Callable):
+        self.make_item = make_item
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open()
+        except Exception:
+            self._mm.close()
+            raise
+
+    def _open(self):
+        if len(self._mm) < HEADER.size:
+            raise ValueError("Файл не є знімком інвентаря")
+        magic, version, _, rows, strings = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError("Файл не є знімком інвентаря")
+        if version != VERSION:
+            raise ValueError(f"Непідтримувана версія знімка: {version}")
+        view = memoryview(self._mm)
+        pos = HEADER.size
+
+        def section(fmt: str, count: int):
+            nonlocal pos
+            size = array(fmt).itemsize * count
+            if pos + size > len(view):
+                raise ValueError("Знімок пошкоджено")
+            data = view[pos:pos + size]
+            pos += size + _pad(size)
+            if NATIVE_LE:
+                return data.cast(fmt)
+            copy = array(fmt, data.tobytes())
+            copy.byteswap()
+            return copy
+
+        self._rows = rows
+        self._quantity = section("q", rows)
+        self._value = section("d", rows)
+        self._refs = [section("I", rows) for _ in STRING_FIELDS]
+        self._offsets = section("Q", strings + 1)
+        self._blob = view[pos:]
+        if self._offsets[-1] > len(self._blob):
+            raise ValueError("Знімок пошкоджено")
+        self._strings = {}
+        self._items: List = [None] * rows
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._rows))]
+        if index < 0:
+            index += self._rows
+        if not 0 <= index < self._rows:
+            raise IndexError("індекс поза межами знімка")
+        item = self._items[index]
+        if item is None:
+            name, category, condition, location, added_at = (self._string(refs[index]) for refs in self._refs)
+            item = self._items[index] = self.make_item(
+                name, category, self._quantity[index], self._value[index],
+                condition, location, added_at)
+        return item
+
+    def __iter__(self):
+        for i in range(self._rows):
+            yield self[i]
+
+    def column(self, field: str) -> Iterable:
+        # Значення одного поля без створення предметів; рядки декодуються
+        # по одному разу на унікальне значення.
+        if field == "quantity":
+            return iter(self._quantity)
+        if field == "value":
+            return iter(self._value)
+        return map(self._string, self._refs[STRING_FIELDS.index(field)])
+
+    def decoded(self) -> int:
+        return sum(1 for item in self._items if item is not None)
+
+    def _string(self, ref: int) -> str:
+        s = self._strings.get(ref)
+        if s is None:
+            s = self._strings[ref] = str(self._blob[self._offsets[ref]:self._offsets[ref + 1]], "utf-8")
+        return s
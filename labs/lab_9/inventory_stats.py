@@ -0,0 +1,134 @@
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set
+import math
+
+
+@dataclass
+class InventoryStats:
+    # Накопичувальні підсумки інвентаря, що оновлюються за O(1) при кожному
+    # додаванні/видаленні предмета. Суми вартості — float, тож verify()
+    # порівнює їх з допуском.
+    #
+    # Порядок категорій — порядок першої появи в списку предметів: category_first
+    # тримає позицію (index.order) першого предмета категорії. Якщо саме його
+    # видалено чи перенесено в іншу категорію, категорія стає в stale і її
+    # позицію перераховує refresh_order лише за предметами цієї категорії.
+    count: int = 0
+    total_value: float = 0.0
+    category_count: Dict[str, int] = field(default_factory=dict)
+    category_quantity: Dict[str, int] = field(default_factory=dict)
+    category_value: Dict[str, float] = field(default_factory=dict)
+    location_count: Dict[str, int] = field(default_factory=dict)
+    category_first: Dict[str, int] = field(default_factory=dict)
+    stale: Set[str] = field(default_factory=set)
+
+    def clear(self):
+        self.count = 0
+        self.total_value = 0.0
+        self.category_count.clear()
+        self.category_quantity.clear()
+        self.category_value.clear()
+        self.location_count.clear()
+        self.category_first.clear()
+        self.stale.clear()
+
+    def rebuild(self, items: Iterable):
+        self.clear()
+        for item in items:
+            self.add(item)
+
+    def rebuild_columns(self, quantity: Iterable[int], value: Iterable[float],
+                        category: Iterable[str], location: Iterable[str]):
+        # Те саме по окремих стовпцях — для знімка без створення предметів.
+        self.clear()
+        count, total = 0, 0.0
+        cat_count, cat_quantity, cat_value = self.category_count, self.category_quantity, self.category_value
+        loc_count, cat_first = self.location_count, self.category_first
+        for q, v, cat, loc in zip(quantity, value, category, location):
+            v = q * v
+            if cat not in cat_first:
+                cat_first[cat] = count
+            count += 1
+            total += v
+            cat_count[cat] = cat_count.get(cat, 0) + 1
+            cat_quantity[cat] = cat_quantity.get(cat, 0) + q
+            cat_value[cat] = cat_value.get(cat, 0.0) + v
+            loc_count[loc] = loc_count.get(loc, 0) + 1
+        self.count, self.total_value = count, total
+
+    def add(self, item, pos: Optional[int] = None):
+        # pos — місце предмета в порядку списку; без нього — кінець списку.
+        self._apply(item.quantity, item.value, item.category, item.location, 1)
+        self._first(item.category, self.count - 1 if pos is None else pos)
+
+    def remove(self, item, pos: int):
+        self._apply(item.quantity, item.value, item.category, item.location, -1)
+        self._forget(item.category, pos)
+        self._drop_empty(item.category, item.location)
+
+    def update(self, before, item, pos: int):
+        # before — (quantity, value, category, location) до зміни; позиція
+        # предмета не змінюється. Суми змінюються на місці, спорожнілі після
+        # зміни категорія чи місце прибираються.
+        self._apply(*before, -1)
+        self._apply(item.quantity, item.value, item.category, item.location, 1)
+        if item.category != before[2]:
+            self._forget(before[2], pos)
+            self._first(item.category, pos)
+        self._drop_empty(before[2], before[3])
+
+    def refresh_order(self, first_of: Callable[[str], int]):
+        # first_of(категорія) — найменша позиція її предметів.
+        for cat in self.stale:
+            self.category_first[cat] = first_of(cat)
+        self.stale.clear()
+
+    def categories(self) -> List[str]:
+        return sorted(self.category_first, key=self.category_first.__getitem__)
+
+    def _first(self, cat, pos):
+        first = self.category_first.get(cat)
+        if first is None or (pos < first and cat not in self.stale):
+            self.category_first[cat] = pos
+
+    def _forget(self, cat, pos):
+        if self.category_first.get(cat) == pos:
+            self.stale.add(cat)
+
+    def _apply(self, quantity, value, cat, location, sign):
+        value = quantity * value
+        self.count += sign
+        self.total_value = self.total_value + sign * value if self.count else 0.0
+        self.category_count[cat] = self.category_count.get(cat, 0) + sign
+        self.category_quantity[cat] = self.category_quantity.get(cat, 0) + sign * quantity
+        self.category_value[cat] = self.category_value.get(cat, 0.0) + sign * value
+        self.location_count[location] = self.location_count.get(location, 0) + sign
+
+    def _drop_empty(self, cat, location):
+        if not self.category_count[cat]:
+            del self.category_count[cat]
+            del self.category_quantity[cat]
+            del self.category_value[cat]
+            del self.category_first[cat]
+            self.stale.discard(cat)
+        if not self.location_count[location]:
+            del self.location_count[location]
+
+    def verify(self, items: Iterable):
+        # Режим перевірки для тестів: порівнюємо з підрахунком з нуля.
+        fresh = InventoryStats()
+        fresh.rebuild(items)
+        problems = []
+        for name in ("count", "category_count", "category_quantity", "location_count"):
+            if getattr(self, name) != getattr(fresh, name):
+                problems.append(name)
+        if not math.isclose(self.total_value, fresh.total_value, rel_tol=1e-9, abs_tol=1e-6):
+            problems.append("total_value")
+        if self.category_value.keys() != fresh.category_value.keys() or any(
+                not math.isclose(v, fresh.category_value[c], rel_tol=1e-9, abs_tol=1e-6)
+                for c, v in self.category_value.items()):
+            problems.append("category_value")
+        if not self.stale and self.categories() != fresh.categories():
+            problems.append("category_first")
+        if problems:
+            raise AssertionError(f"Підсумки розійшлися з даними: {', '.join(problems)}")
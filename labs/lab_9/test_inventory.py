@@ -0,0 +1,176 @@
+import os
+import random
+
+import pytest
+
+from inventory import CSV_FIELDS, Inventory, Item, csv_ranges, iter_csv, iter_csv_parallel
+
+CATEGORIES = ["Інструменти", "електроніка", "Меблі"]
+CONDITIONS = ["новий", "Вживаний"]
+LOCATIONS = ["гараж", "Кімната", "комора"]
+
+
+def linear_filter(items, name=None, category=None, condition=None, location=None,
+                  min_value=None, max_value=None):
+    return [
+        i for i in items
+        if (not name or name.lower() in i.name.lower())
+        and (not category or i.category.lower() == category.lower())
+        and (not condition or i.condition.lower() == condition.lower())
+        and (not location or i.location.lower() == location.lower())
+        and (min_value is None or i.value >= min_value)
+        and (max_value is None or i.value <= max_value)
+    ]
+
+
+def make_inventory(n=300):
+    rnd = random.Random(7)
+    inv = Inventory()
+    for k in range(n):
+        inv.add_item(Item(f"Предмет {k % 40}", rnd.choice(CATEGORIES), rnd.randint(1, 5),
+                          float(rnd.randint(1, 50)), rnd.choice(CONDITIONS), rnd.choice(LOCATIONS)))
+    return inv
+
+
+def test_filter_matches_linear_scan():
+    inv = make_inventory()
+    rnd = random.Random(1)
+    inv.sort_items()
+    inv.remove_item("ПРЕДМЕТ 3")
+    inv.add_item(Item("Молоток", "інструменти", 1, 25.0, "новий", "гараж"))
+    for _ in range(300):
+        criteria = {
+            "name": rnd.choice([None, None, "предмет 1", "МОЛ"]),
+            "category": rnd.choice([None, "інструменти", "ЕЛЕКТРОНІКА", "книги"]),
+            "condition": rnd.choice([None, "вживаний"]),
+            "location": rnd.choice([None, "гараж", "кімната"]),
+            "min_value": rnd.choice([None, 10.0, 25.0, 60.0]),
+            "max_value": rnd.choice([None, 25.0, 40.0]),
+        }
+        assert inv.filter_items(**criteria) == linear_filter(inv.items, **criteria)
+    assert all(i.name != "Предмет 3" for i in inv.items)
+    assert inv.find_by_category("МЕБЛІ") == linear_filter(inv.items, category="меблі")
+
+
+def test_direct_list_changes_are_reindexed():
+    inv = make_inventory(20)
+    inv.items.append(Item("Сокира", "інструменти", 2, 120.0, "новий", "комора")) #повз add_item
+    assert [i.name for i in inv.filter_items(min_value=100)] == ["Сокира"]
+
+
+def test_item_lazy_added_at_and_csv_roundtrip(tmp_path):
+    item = Item("Ноутбук", "електроніка", 1, 18000.0, "вживаний", "кімната")
+    assert not isinstance(item._added_at, str)
+    assert len(item.added_at) == 19 and item._added_at == item.added_at #відформатовано один раз
+    inv = Inventory()
+    inv.add_item(item)
+    inv.add_item(Item("Гаечний ключ", "інструменти", 3, 15.0, "вживаний", "гараж", "2025-01-01 10:00:00"))
+    inv.sort_items()
+    assert [i.name for i in inv.items] == ["Ноутбук", "Гаечний ключ"]
+    path = str(tmp_path / "inventory.csv")
+    inv.save_to_csv(path)
+    loaded = Inventory()
+    loaded.load_from_csv(path)
+    assert loaded.items == inv.items
+    assert not hasattr(item, "__dict__")
+
+
+def test_parallel_load_matches_sequential(tmp_path):
+    inv = make_inventory(500)
+    inv.add_item(Item('Стіл, "дубовий"', "меблі", 1, 2500.5, "новий", "кімната"))
+    path = str(tmp_path / "big.csv")
+    inv.save_to_csv(path)
+    header, ranges = csv_ranges(path, chunk_size=1000)
+    assert header == CSV_FIELDS and len(ranges) > 5
+    assert ranges[-1][1] == os.path.getsize(path)
+    assert list(iter_csv_parallel(path, workers=2, chunk_size=1000)) == list(iter_csv(path)) == inv.items
+    loaded = Inventory()
+    loaded.load_from_csv(path, parallel=True)
+    assert loaded.filter_items(category="меблі", min_value=2500) == [loaded.items[-1]]
+
+
+def test_running_totals_stay_consistent():
+    rnd = random.Random(3)
+    inv = Inventory(check_totals=True) #кожна зміна звіряється з підрахунком з нуля
+    for k in range(200):
+        inv.add_item(Item(f"Предмет {k % 30}", rnd.choice(CATEGORIES), rnd.randint(0, 5),
+                          rnd.uniform(0.1, 100), rnd.choice(CONDITIONS), rnd.choice(LOCATIONS)))
+        if k % 7 == 0:
+            inv.update_item(rnd.choice(inv.items), quantity=rnd.randint(0, 9),
+                            category=rnd.choice(CATEGORIES), location=rnd.choice(LOCATIONS))
+        if k % 11 == 0:
+            inv.remove_item(f"предмет {rnd.randrange(30)}")
+    inv.sort_items()
+    assert inv.total_inventory_value() == pytest.approx(sum(i.total_value() for i in inv.items))
+    summary = {}
+    for item in inv.items:
+        summary[item.category] = summary.get(item.category, 0) + item.quantity
+    assert inv.export_summary() == "\n".join(f"{c}: {q} шт." for c, q in summary.items())
+    assert inv.filter_items(category=inv.items[0].category)[0] is inv.items[0]
+
+    inv.stats.total_value += 1
+    with pytest.raises(AssertionError, match="total_value"):
+        inv.add_item(Item("Молоток", "інструменти", 1, 25.0, "новий", "гараж"))
+
+
+def test_summary_keeps_first_seen_order():
+    inv = Inventory(check_totals=True) #перевірка звіряє й порядок категорій
+    lamp = Item("Лампа", "X", 1, 10.0, "новий", "кімната")
+    inv.add_item(lamp)
+    inv.add_item(Item("Стілець", "Y", 2, 20.0, "новий", "кімната"))
+    inv.add_item(Item("Полиця", "X", 3, 5.0, "новий", "комора"))
+    inv.update_item(lamp, quantity=5)
+    assert inv.export_summary() == "X: 8 шт.\nY: 2 шт."
+    inv.update_item(lamp, category="Z") #перший предмет X тепер у Z
+    assert inv.export_summary() == "Z: 5 шт.\nY: 2 шт.\nX: 3 шт."
+    inv.remove_item("лампа")
+    assert inv.export_summary() == "Y: 2 шт.\nX: 3 шт."
+    inv.add_item(Item("Лампа", "X", 1, 10.0, "новий", "кімната"))
+    assert inv.export_summary() == "Y: 2 шт.\nX: 4 шт."
+
+
+def test_snapshot_roundtrip_is_lazy(tmp_path):
+    inv = make_inventory(100)
+    inv.add_item(Item("Ноутбук", "електроніка", 1, 18000.0, "вживаний", "кімната"))
+    path = str(tmp_path / "inventory.snap")
+    inv.save_snapshot(path)
+
+    opened = Inventory()
+    opened.open_snapshot(path)
+    assert len(opened.items) == 101 and opened.items.decoded() == 0
+    assert opened.items[-1] == inv.items[-1] and opened.items[-1] is opened.items[100]
+    assert opened.items.decoded() == 1 #декодовано лише торкнутий предмет
+    assert opened.export_summary() == inv.export_summary()
+    assert opened.total_inventory_value() == pytest.approx(inv.total_inventory_value())
+    assert opened.items.decoded() == 1
+    assert list(opened.items) == inv.items
+    opened.remove_item("ноутбук")
+    opened.add_item(Item("Сокира", "інструменти", 2, 120.0, "новий", "комора"))
+    assert [i.name for i in opened.filter_items(min_value=100)] == ["Сокира"]
+
+    with open(path, "r+b") as f:
+        f.seek(8)
+        f.write(b"\x09")
+    with pytest.raises(ValueError, match="версія"):
+        Inventory().open_snapshot(path)
+
+
+def test_ordered_reads_match_full_sort():
+    inv = make_inventory(300)
+    inv.add_item(Item("Шафа", "меблі", 1, 50.0, "новий", "кімната"))
+    expected = sorted(inv.items, key=Item.sort_key)
+    assert list(inv.iter_sorted()) == expected
+    assert list(inv.iter_sorted("МЕБЛІ")) == [i for i in expected if i.category.lower() == "меблі"]
+
+    inv.remove_item("предмет 5") #індекс підтримується при змінах
+    inv.update_item(inv.items[0], value=49.0, category="Меблі")
+    inv.add_item(Item("Стіл", "Меблі", 2, 49.0, "новий", "кімната"))
+    by_value = sorted(inv.items, key=lambda i: i.value, reverse=True)
+    assert inv.top_k(15) == by_value[:15]
+    assert inv.top_k(5, category="меблі") == [i for i in by_value if i.category.lower() == "меблі"][:5]
+    assert inv.top_k(7, key=Item.total_value) == sorted(inv.items, key=Item.total_value, reverse=True)[:7]
+    assert inv.top_k(0) == [] and inv.top_k(5, category="книги") == []
+
+    expected = sorted(inv.items, key=Item.sort_key)
+    inv.sort_items()
+    assert inv.items == expected and inv.filter_items(category=expected[0].category)[0] is expected[0]
@@ -0,0 +1,92 @@
+class SearchIndex:
+    # Пошук підрядка в кількох текстових полях (без урахування регістру).
+    # Для кожного запису зберігаємо поля в нижньому регістрі одним рядком
+    # (через "\n", якого немає в однорядковому запиті) та індекс
+    # триграма -> множина ключів. Запит з 3+ символів звужується перетином
+    # множин його триграм, коротший — перебором готових рядків. Якщо новий
+    # запит містить попередній, шукаємо лише серед попередніх збігів.
+
+    N = 3
+
+    def __init__(self):
+        self.texts = {}
+        self.grams = {}
+        self._last_query = None
+        self._last_result = None
+
+    def __len__(self):
+        return len(self.texts)
+
+    def clear(self):
+        self.texts.clear()
+        self.grams.clear()
+        self._last_query = None
+
+    def add(self, key, *fields):
+        text = self._text(fields)
+        self.texts[key] = text
+        for g in self._grams(text):
+            keys = self.grams.get(g)
+            if keys is None:
+                self.grams[g] = {key}
+            else:
+                keys.add(key)
+        self._last_query = None
+
+    def remove(self, key):
+        text = self.texts.pop(key, None)
+        if text is None:
+            return
+        for g in self._grams(text):
+            keys = self.grams.get(g)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.grams[g]
+        self._last_query = None
+
+    def update(self, key, *fields):
+        if self.texts.get(key) == self._text(fields):
+            return
+        self.remove(key)
+        self.add(key, *fields)
+
+    def search(self, query):
+        # Повертає множину ключів, у полях яких є query.
+        q = query.strip().lower()
+        if len(q) >= self.N:
+            candidates, exact = self._gram_candidates(q)
+        else:
+            candidates, exact = self.texts, not q
+        if self._last_query and self._last_query in q and len(self._last_result) < len(candidates):
+            candidates = self._last_result
+            exact = self._last_query == q
+        if exact:
+            result = set(candidates)
+        else:
+            texts = self.texts
+            result = {k for k in candidates if q in texts[k]}
+        self._last_query = q
+        self._last_result = result
+        return result
+
+    def _gram_candidates(self, q):
+        n = self.N
+        sets = []
+        for g in {q[i:i + n] for i in range(len(q) - n + 1)}:
+            keys = self.grams.get(g)
+            if not keys:
+                return set(), True
+            sets.append(keys)
+        # Запит рівно з однієї триграми не потребує перевірки.
+        if len(sets) == 1:
+            return sets[0], len(q) == n
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:]), False
+
+    def _text(self, fields):
+        return "\n".join(str(f).lower() for f in fields)
+
+    def _grams(self, text):
+        n = self.N
+        return {g for g in (text[i:i + n] for i in range(len(text) - n + 1)) if "\n" not in g}
@@ -0,0 +1,243 @@
+import bisect
+import sys
+from array import array
+
+COLUMNS = ("id", "name", "category", "quantity", "price", "location", "created_at")
+INTERNED = ("category", "location")
+
+
+class ColumnTable:
+    # Таблиця товарів по стовпцях: quantity/price — типізовані масиви,
+    # category/location — інтерновані рядки (кілька унікальних значень на
+    # мільйони рядків), решта — списки рядків. Кожен рядок має незмінний
+    # ключ key (для індексів, що переживають сортування і видалення);
+    # мапи id -> позиція і key -> позиція будуються ліниво.
+    #
+    # Сортування не переставляє стовпці: self.order — порядок показу
+    # (позиції рядків), None — порядок додавання. Ключі сортування по
+    # стовпцях і готові перестановки кешуються до зміни даних.
+
+    def __init__(self):
+        self.columns = {c: [] for c in COLUMNS}
+        self.columns["quantity"] = array("q")
+        self.columns["price"] = array("d")
+        self.keys = array("q")
+        self.order = None
+        self.sort_spec = ()
+        self._next_key = 1
+        self._max_id = 0
+        self._by_id = None
+        self._by_key = None
+        self._ranks = None
+        self._sort_keys = {}
+        self._perms = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def append(self, values):
+        # values — кортеж у порядку COLUMNS; повертає позицію рядка.
+        cols = self.columns
+        index = len(self.keys)
+        for c, v in zip(COLUMNS, values):
+            cols[c].append(sys.intern(v) if c in INTERNED else v)
+        key = self._next_key
+        self._next_key += 1
+        self.keys.append(key)
+        self._track_id(values[0])
+        if self._by_id is not None:
+            self._by_id[str(values[0])] = index
+        if self._by_key is not None:
+            self._by_key[key] = index
+        # Новий рядок показується в кінці, як і до сортування.
+        if self.order is not None:
+            self.order.append(index)
+            if self._ranks is not None:
+                self._ranks.append(len(self.order) - 1)
+        self._sort_keys.clear()
+        self._perms.clear()
+        return index
+
+    def extend(self, rows):
+        start = len(self.keys)
+        for values in rows:
+            self.append(values)
+        return start
+
+    def update(self, index, values):
+        # values — словник лише зі зміненими полями.
+        cols = self.columns
+        old_id = cols["id"][index]
+        changed = set()
+        for c, v in values.items():
+            v = sys.intern(v) if c in INTERNED else v
+            if cols[c][index] != v:
+                cols[c][index] = v
+                changed.add(c)
+        if not changed:
+            return
+        new_id = cols["id"][index]
+        if new_id != old_id:
+            if self._by_id is not None:
+                del self._by_id[old_id]
+                self._by_id[new_id] = index
+            if old_id.isdigit() and int(old_id) == self._max_id:
+                self._max_id = None
+            self._track_id(new_id)
+        for c in changed:
+            self._sort_keys.pop(c, None)
+        for spec in [s for s in self._perms if changed.intersection(c for c, _ in s)]:
+            del self._perms[spec]
+
+    def delete(self, index):
+        item_id = self.columns["id"][index]
+        for column in self.columns.values():
+            del column[index]
+        del self.keys[index]
+        if item_id.isdigit() and int(item_id) == self._max_id:
+            self._max_id = None
+        if self.order is not None:
+            self.order = array("q", [i - (i > index) for i in self.order if i != index])
+        self._by_id = None
+        self._by_key = None
+        self._ranks = None
+        self._sort_keys.clear()
+        self._perms.clear()
+
+    def clear(self):
+        for column in self.columns.values():
+            del column[:]
+        del self.keys[:]
+        self.order = None
+        self.sort_spec = ()
+        self._max_id = 0
+        self._by_id = None
+        self._by_key = None
+        self._ranks = None
+        self._sort_keys.clear()
+        self._perms.clear()
+
+    def find(self, item_id):
+        if self._by_id is None:
+            self._by_id = {v: i for i, v in enumerate(self.columns["id"])}
+        return self._by_id.get(str(item_id))
+
+    def positions(self):
+        if self._by_key is None:
+            self._by_key = {k: i for i, k in enumerate(self.keys)}
+        return self._by_key
+
+    def max_id(self):
+        if self._max_id is None:
+            self._max_id = max((int(x) for x in self.columns["id"] if x.isdigit()), default=0)
+        return self._max_id
+
+    def _track_id(self, item_id):
+        item_id = str(item_id)
+        if self._max_id is not None and item_id.isdigit():
+            self._max_id = max(self._max_id, int(item_id))
+
+    def row(self, index):
+        return {c: self.columns[c][index] for c in COLUMNS}
+
+    def values(self, index):
+        return tuple(self.columns[c][index] for c in COLUMNS)
+
+    def sort_keys(self, col):
+        # Числові стовпці — самі собі ключі; текстові перетворюються один
+        # раз: у float, якщо всі значення числові, інакше в нижній регістр.
+        column = self.columns[col]
+        if isinstance(column, array):
+            return column
+        keys = self._sort_keys.get(col)
+        if keys is None:
+            try:
+                keys = array("d", [float(v) for v in column])
+            except ValueError:
+                keys = [str(v).lower() for v in column]
+            self._sort_keys[col] = keys
+        return keys
+
+    def sort(self, spec):
+        # spec — послідовність (стовпець, reverse), перший стовпець головний.
+        # Стабільні сортування від останнього ключа до першого.
+        spec = tuple(spec)
+        order = self._perms.get(spec)
+        if order is None:
+            order = list(range(len(self.keys)))
+            for col, reverse in reversed(spec):
+                order.sort(key=self.sort_keys(col).__getitem__, reverse=reverse)
+            order = array("q", order)
+            self._perms[spec] = order
+        self.sort_spec = spec
+        self.order = array("q", order) if spec else None
+        self._ranks = None
+
+    def display_indices(self, keys):
+        # Номери рядків у порядку показу для множини ключів (результату пошуку).
+        positions = self.positions()
+        if self.order is None:
+            return sorted(positions[k] for k in keys)
+        ranks = self.ranks()
+        return sorted(ranks[positions[k]] for k in keys)
+
+    def ranks(self):
+        # Позиція рядка -> місце в порядку показу (лише коли є сортування).
+        if self._ranks is None:
+            ranks = array("q", bytes(8 * len(self.order)))
+            for rank, pos in enumerate(self.order):
+                ranks[pos] = rank
+            self._ranks = ranks
+        return self._ranks
+
+    def copy(self):
+        # Знімок для фонового збереження: копіюються лише стовпці-посилання.
+        other = ColumnTable()
+        other.columns = {c: column[:] for c, column in self.columns.items()}
+        other.keys = self.keys[:]
+        other.order = None if self.order is None else self.order[:]
+        other._next_key = self._next_key
+        other._max_id = self._max_id
+        return other
+
+    def iter_rows(self):
+        # Рядки в порядку показу.
+        if self.order is None:
+            return zip(*(self.columns[c] for c in COLUMNS))
+        return map(self.values, self.order)
+
+    def view(self, indices=None):
+        return TableRows(self, indices)
+
+
+class TableRows:
+    # Лінива послідовність кортежів для VirtualTree: усі рядки таблиці в
+    # порядку показу або лише вибрані номери (результат пошуку).
+
+    def __init__(self, table, indices=None):
+        self.table = table
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.table) if self.indices is None else len(self.indices)
+
+    def __getitem__(self, i):
+        if self.indices is not None:
+            i = self.indices[i]
+        order = self.table.order
+        return self.table.values(i if order is None else order[i])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def index_of(self, item_id):
+        # Номер рядка з цим id у послідовності або None — без перебору рядків.
+        pos = self.table.find(item_id)
+        if pos is None:
+            return None
+        rank = pos if self.table.order is None else self.table.ranks()[pos]
+        if self.indices is None:
+            return rank
+        i = bisect.bisect_left(self.indices, rank)
+        return i if i < len(self.indices) and self.indices[i] == rank else None
@@ -0,0 +1,67 @@
+import os
+import queue
+import threading
+
+from lab_7 import COLUMNS, read_csv_chunks, search_rows, write_csv_atomic
+from search_index import SearchIndex
+from table_model import ColumnTable
+
+
+def make_rows(n):
+    return [(str(i), f"Товар {i}", "Меблі", i, 1.5 * i, "Склад", "2025-01-01T00:00:00")
+            for i in range(1, n + 1)]
+
+
+def drain(path, chunk_rows):
+    out = queue.Queue()
+    read_csv_chunks(path, out, threading.Event(), chunk_rows=chunk_rows)
+    return [out.get_nowait() for _ in range(out.qsize())]
+
+
+def test_chunks_roundtrip(tmp_path):
+    path = str(tmp_path / "items.csv")
+    rows = make_rows(25)
+    write_csv_atomic(path, rows)
+    assert os.listdir(tmp_path) == ["items.csv"]
+
+    messages = drain(path, chunk_rows=10)
+    assert [m[0] for m in messages] == ["rows", "rows", "rows", "done"]
+    assert [len(m[1]) for m in messages[:3]] == [10, 10, 5]
+    progress = [m[2] for m in messages[:3]]
+    assert progress == sorted(progress) and progress[-1] == 1.0
+    loaded = [row for m in messages[:3] for row in m[1]]
+    assert loaded == rows
+
+
+def test_bad_header_and_cancel(tmp_path):
+    path = tmp_path / "bad.csv"
+    path.write_text("id,name\n1,x\n", encoding="utf-8")
+    assert drain(str(path), 10) == [("error", "Невірні заголовки CSV", None)]
+    path.write_text(",".join(COLUMNS) + "\n1,x\n", encoding="utf-8")
+    assert drain(str(path), 10) == [("error", "Рядок 2: очікується 7 полів", None)]
+
+    good = str(tmp_path / "items.csv")
+    write_csv_atomic(good, make_rows(50))
+    out = queue.Queue(maxsize=1)
+    cancel = threading.Event()
+    reader = threading.Thread(target=read_csv_chunks, args=(good, out, cancel, 10))
+    reader.start()
+    assert out.get(timeout=5)[0] == "rows"
+    cancel.set() #заблокований на повній черзі потік має завершитися
+    reader.join(timeout=5)
+    assert not reader.is_alive()
+    assert tuple(COLUMNS) == tuple(open(good, encoding="utf-8").readline().strip().split(","))
+
+
+def test_search_while_sorted():
+    table, index = ColumnTable(), SearchIndex()
+    table.extend([
+        ("1", "apple", "Фрукти", 3, 9.0, "Склад", "2025-01-01T00:00:00"),
+        ("2", "banana", "Фрукти", 5, 1.0, "Склад", "2025-01-01T00:00:00"),
+        ("3", "apple pie", "Випічка", 1, 5.0, "Склад", "2025-01-01T00:00:00"),
+    ])
+    for i, key in enumerate(table.keys):
+        index.add(key, table.columns["name"][i], table.columns["category"][i])
+    table.sort([("price", False)])
+    assert [r[1] for r in search_rows(table, index, "apple")] == ["apple pie", "apple"]
+    assert [r[1] for r in search_rows(table, index, "")] == ["banana", "apple pie", "apple"]
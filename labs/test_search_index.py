@@ -0,0 +1,32 @@
+from search_index import SearchIndex
+
+
+def make_index():
+    index = SearchIndex()
+    index.add(1, "Ноутбук Lenovo", "Електроніка")
+    index.add(2, "Мишка", "Електроніка")
+    index.add(3, "Стілець", "Меблі")
+    return index
+
+
+def test_search_matches_linear_scan():
+    index = make_index()
+    assert index.search("ЕЛЕКТ") == {1, 2}
+    assert index.search("eno") == {1}
+    assert index.search("і") == {1, 2, 3}
+    assert index.search("ка") == {1, 2}
+    assert index.search("иш") == {2}
+    assert index.search("шафа") == set()
+    assert index.search("") == {1, 2, 3}
+
+
+def test_narrowing_and_changes():
+    index = make_index()
+    assert index.search("м") == {2, 3}
+    assert index.search("ме") == {3}
+    assert index.search("мебл") == {3}
+    index.update(2, "Мишка", "Меблі") #індекс оновлюється і скидає звуження
+    assert index.search("мебл") == {2, 3}
+    index.remove(3)
+    assert index.search("мебл") == {2}
+    assert "меб" in index.grams and "тіл" not in index.grams
@@ -0,0 +1,69 @@
+from table_model import ColumnTable
+
+
+def make_table():
+    table = ColumnTable()
+    table.extend([
+        ("1", "Стілець", "Меблі", 4, 1200.0, "Склад", "2025-01-01T00:00:00"),
+        ("10", "Мишка", "Електроніка", 15, 350.5, "Офіс", "2025-01-02T00:00:00"),
+        ("2", "Шафа", "Меблі", 1, 5400.0, "Склад", "2025-01-03T00:00:00"),
+        ("3", "Лампа", "Електроніка", 4, 800.0, "Офіс", "2025-01-04T00:00:00"),
+    ])
+    return table
+
+
+def shown(table, col="id"):
+    return [row[0 if col == "id" else 1] for row in table.view()]
+
+
+def test_sort_uses_cached_keys_and_permutations():
+    table = make_table()
+    table.sort([("id", False)])
+    assert shown(table) == ["1", "2", "3", "10"]
+    table.sort([("name", True)])
+    assert shown(table, "name") == ["Шафа", "Стілець", "Мишка", "Лампа"]
+    table.sort([("category", False), ("quantity", True), ("id", False)])
+    assert shown(table) == ["10", "3", "1", "2"]
+    order = table._perms[table.sort_spec]
+    table.sort([("id", False)])
+    table.sort([("category", False), ("quantity", True), ("id", False)])
+    assert table._perms[table.sort_spec] is order #повторний клік бере готову перестановку
+    assert list(table.iter_rows()) == list(table.view())
+    table.update(table.find("3"), {"name": "Торшер"})
+    assert table.sort_spec in table._perms
+    table.update(table.find("3"), {"quantity": 20})
+    assert table.sort_spec not in table._perms and "quantity" not in table._sort_keys
+
+
+def test_mutations_keep_order_ids_and_max_id():
+    table = make_table()
+    table.sort([("price", False)])
+    assert table.max_id() == 10
+    table.update(table.find("10"), {"id": "11"})
+    assert table.max_id() == 11 and table.find("10") is None
+    table.delete(table.find("11"))
+    assert table.max_id() == 3
+    assert shown(table) == ["3", "1", "2"]
+    table.append(("12", "Кабель", "Електроніка", 7, 99.0, "Склад", "2025-01-05T00:00:00"))
+    assert shown(table) == ["3", "1", "2", "12"]
+    for i, row in enumerate(table.view()):
+        assert table.find(row[0]) == table.order[i]
+    keys = {table.keys[table.find(i)] for i in ("2", "12")}
+    assert [table.view(table.display_indices(keys))[i][0] for i in range(2)] == ["2", "12"]
+    snapshot = table.copy()
+    table.delete(table.find("1"))
+    assert [r[0] for r in snapshot.iter_rows()] == ["3", "1", "2", "12"]
+    assert table.columns["category"][0] is snapshot.columns["category"][0]
+
+
+def test_rows_index_of_follows_sort_and_filter():
+    table = make_table()
+    rows = table.view()
+    assert [rows.index_of(r[0]) for r in rows] == [0, 1, 2, 3]
+    table.sort([("price", True)])
+    rows = table.view()
+    assert [rows.index_of(r[0]) for r in rows] == [0, 1, 2, 3]
+    keys = {table.keys[table.find(i)] for i in ("1", "10")}
+    found = table.view(table.display_indices(keys))
+    assert [r[0] for r in found] == ["1", "10"]
+    assert found.index_of("10") == 1 and found.index_of("2") is None and found.index_of("99") is None
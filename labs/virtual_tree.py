@@ -0,0 +1,167 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualTree:
+    # Віртуальний режим для ttk.Treeview: у віджеті живе лише видиме вікно
+    # рядків (+ overscan), самі дані — у self.rows (список кортежів значень).
+    # Рядки-слоти перевикористовуються, і при оновленні змінюються лише ті,
+    # значення яких відрізняються. Прокруткою керує власний Scrollbar.
+    # Виділення запам'ятовується за першим значенням рядка (id). Якщо rows
+    # вміє index_of(id) (TableRows), рядок шукається через нього, інакше —
+    # лише у видимому вікні: повний перебір на кожне оновлення забирав би
+    # усю вигоду віртуалізації, тож невидиме виділення скидається.
+
+    def __init__(self, tree, scrollbar=None, on_select=None, overscan=5):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.on_select = on_select
+        self.overscan = overscan
+        self.rows = []
+        self.offset = 0
+        self.visible = int(str(tree.cget("height")))
+        self._slots = []
+        self._shown = []
+        self._selected = None
+
+        tree.configure(yscrollcommand="")
+        if scrollbar is not None:
+            scrollbar.configure(command=self.yview)
+        tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        tree.bind("<Configure>", self._on_configure)
+        tree.bind("<MouseWheel>", self._on_wheel)
+        tree.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        tree.bind("<Button-5>", lambda e: self._scroll_by(3))
+        tree.bind("<Up>", lambda e: self._move_selection(-1))
+        tree.bind("<Down>", lambda e: self._move_selection(1))
+        tree.bind("<Prior>", lambda e: self._scroll_by(-self.visible))
+        tree.bind("<Next>", lambda e: self._scroll_by(self.visible))
+
+    def set_rows(self, rows):
+        self.rows = rows
+        self._clamp()
+        if self._selected is not None:
+            index = self._locate(self._selected[0])
+            self._selected = None if index is None else rows[index]
+        self._render()
+
+    def selected_values(self):
+        return self._selected
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self.visible
+            self.offset += step
+        self._clamp()
+        self._render()
+
+    def _scroll_by(self, step):
+        self.offset += step
+        self._clamp()
+        self._render()
+        return "break"
+
+    def _on_wheel(self, event):
+        return self._scroll_by(-1 if event.delta > 0 else 1)
+
+    def _move_selection(self, step):
+        if not self.rows:
+            return "break"
+        index = self._selected_index()
+        index = 0 if index is None else min(max(index + step, 0), len(self.rows) - 1)
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + self.visible:
+            self.offset = index - self.visible + 1
+        self._clamp()
+        self._select(self.rows[index])
+        self._render()
+        return "break"
+
+    def _selected_index(self):
+        if self._selected is None:
+            return None
+        return self._locate(self._selected[0])
+
+    def _locate(self, key):
+        index_of = getattr(self.rows, "index_of", None)
+        if index_of is not None:
+            return index_of(key)
+        end = min(len(self.rows), self.offset + self.visible + self.overscan)
+        for i in range(self.offset, end):
+            if self.rows[i][0] == key:
+                return i
+        return None
+
+    def _select(self, values):
+        changed = self._selected is None or self._selected[0] != values[0]
+        self._selected = values
+        if changed and self.on_select is not None:
+            self.on_select(values)
+
+    def _on_tree_select(self, _):
+        # Програмне відновлення виділення після прокрутки теж генерує подію —
+        # реагуємо лише тоді, коли справді вибрано інший рядок.
+        sel = self.tree.selection()
+        if not sel or sel[0] not in self._slots:
+            return
+        values = self._shown[self._slots.index(sel[0])]
+        if values is not None:
+            self._select(values)
+
+    def _on_configure(self, event):
+        style = ttk.Style()
+        row_height = int(style.lookup("Treeview", "rowheight") or 20)
+        visible = max(1, event.height // row_height - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self._clamp()
+            self._render()
+
+    def _clamp(self):
+        self.offset = max(0, min(self.offset, len(self.rows) - self.visible))
+
+    def _render(self):
+        window = self.visible + self.overscan
+        while len(self._slots) < window:
+            self._slots.append(self.tree.insert("", tk.END, values=()))
+            self._shown.append(())
+
+        selected_slot = None
+        key = self._selected[0] if self._selected is not None else None
+        for i, slot in enumerate(self._slots):
+            index = self.offset + i
+            values = self.rows[index] if i < window and index < len(self.rows) else None
+            shown = self._shown[i]
+            if values is None:
+                if shown is not None:
+                    self.tree.detach(slot)
+                    self._shown[i] = None
+                continue
+            if shown is None:
+                self.tree.move(slot, "", i)
+            if shown != values:
+                self.tree.item(slot, values=values)
+            self._shown[i] = values
+            if key is not None and values[0] == key:
+                selected_slot = slot
+
+        current = self.tree.selection()
+        if selected_slot is None:
+            if current:
+                self.tree.selection_remove(current)
+        elif current != (selected_slot,):
+            self.tree.selection_set(selected_slot)
+        self.tree.yview_moveto(0)
+
+        if self.scrollbar is not None:
+            total = len(self.rows)
+            if total:
+                self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible) / total))
+            else:
+                self.scrollbar.set(0.0, 1.0)
+